@@ -1,56 +1,131 @@
 import os
-import requests
+import http_client
 import oracledb
 import base64
 import re
-from flask import Flask, request, jsonify, g, send_from_directory, make_response
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import Flask, request, jsonify, g, send_from_directory, make_response, Response
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta
 
-from config import UPLOAD_FOLDER, SPOTIFY_API_BASE
-from database import get_db_connection, close_db, init_db_pool
-from services import update_box_office_data, save_track_details
-from utils import allowed_file, verify_turnstile, get_spotify_headers, get_current_weather, get_today_holiday, extract_spotify_id
-
+from config import UPLOAD_FOLDER, SPOTIFY_API_BASE, SKOS_FILE, SKOS_WATCH_INTERVAL, SKOS_SYNC_INTERVAL, TAG_INDEX_RECONCILE_INTERVAL, SEARCH_PAGE_SIZE, \
+    SEARCH_DEADLINE_SEC, SEARCH_FANOUT_WORKERS, HTTP_CONNECT_TIMEOUT
+from database import get_db_connection, close_db, init_db_pool, acquire_connection, get_pool_stats
+from services import update_box_office_data, save_track_details, save_tracks_bulk, fetch_playlist_track_ids
+from skos_manager import init_skos_manager, get_skos_manager, broadcast_reload, skos_status, start_skos_watcher
+from utils import allowed_file, verify_turnstile, get_spotify_headers, get_spotify_token_stats, extract_spotify_id, normalize_tag_key
+from context_provider import get_context, start_context_provider, context_targets, context_search_tags, context_track_items, context_response
+import recommend_pool
+import tag_index
+import search_cache
+import render_cache
+import export_rdf
+import audit_log
+import user_auth
+import tag_search
+
+# 읽기 전용 데이터(SKOS 어휘)는 import 시점에 로드
+# -> gunicorn preload 모드에서는 마스터가 한 번 로드하고 fork된 워커들이 copy-on-write로 공유
 try:
-    from skos_manager import SkosManager
-    skos_manager = SkosManager("new_data.ttl")
-    print("✅ SKOS Manager Loaded Successfully (from new_data.ttl).")
+    init_skos_manager(SKOS_FILE)
+    print(f"✅ SKOS Manager Loaded Successfully (from {SKOS_FILE}).")
 except Exception as e:
     print(f"⚠️ SKOS Load Error: {e}")
-    skos_manager = None
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024 
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-CORS(app)
+CORS(app, expose_headers=["X-Next-Cursor", "Server-Timing"])
 app.teardown_appcontext(close_db)
 
-with app.app_context():
-    init_db_pool()
+_search_executor = None
+
+def init_worker():
+    """프로세스별 자원 초기화 (DB 풀, HTTP 세션, 백그라운드 스레드)
+    fork 이후 워커마다 한 번 호출해야 함 - 소켓/스레드는 fork로 복제되지 않음 (gunicorn.conf.py의 post_fork)"""
+    global _search_executor
+    http_client.reset_sessions()  # 마스터에서 만든 keep-alive 소켓을 워커끼리 공유하지 않도록
+    with app.app_context():
+        init_db_pool()
+    start_skos_watcher(SKOS_WATCH_INTERVAL, SKOS_SYNC_INTERVAL)
+    start_context_provider()
+    audit_log.start_audit_log()
+    _search_executor = ThreadPoolExecutor(max_workers=SEARCH_FANOUT_WORKERS, thread_name_prefix="search")
+    tag_index.start_tag_index(TAG_INDEX_RECONCILE_INTERVAL)
+
+# flask run / python app.py / 스크립트에서 import 할 때는 바로 초기화 (gunicorn은 워커 fork 후 직접 호출)
+if os.getenv("APP_DEFER_WORKER_INIT") != "1":
+    init_worker()
 
 # =========================================================
 # 1. 관리자 & 로그 API (밴 기능 추가됨)
 # =========================================================
+LOG_PAGE_MAX = 200
+
+def _encode_log_cursor(created_at, log_id):
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{log_id}".encode()).decode().rstrip("=")
+
+def _decode_log_cursor(cursor):
+    """'created_at|log_id' (base64) -> (datetime, log_id), 형식 오류 시 ValueError"""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    created_at, log_id = raw.split('|', 1)
+    return datetime.fromisoformat(created_at), int(log_id)
+
+def _log_page_args(default_limit=50):
+    """?limit= (최대 LOG_PAGE_MAX), ?cursor= (이전 페이지의 X-Next-Cursor) -> (limit, (created_at, log_id) 또는 None)
+    형식 오류 시 ValueError - DB 커넥션을 잡기 전에 호출해 400으로 응답"""
+    limit = min(max(int(request.args.get('limit', default_limit)), 1), LOG_PAGE_MAX)
+    cursor = _decode_log_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    return limit, cursor
+
+def _fetch_log_page(cur, select_sql, where, binds, page):
+    """MODIFICATION_LOGS 키셋 페이지네이션 (created_at, log_id 내림차순)
+    page: _log_page_args() 결과 -> (행 목록, 다음 커서 또는 None)"""
+    limit, cursor = page
+    if cursor:
+        c_at, c_id = cursor
+        where = where + ["(l.created_at < :c_at OR (l.created_at = :c_at AND l.log_id < :c_id))"]
+        binds = {**binds, "c_at": c_at, "c_id": c_id}
+        cur.setinputsizes(c_at=oracledb.DB_TYPE_TIMESTAMP)
+    sql = f"""{select_sql}
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY l.created_at DESC, l.log_id DESC
+        FETCH FIRST :n ROWS ONLY"""
+    cur.execute(sql, {**binds, "n": limit + 1})
+    rows = cur.fetchall()
+    return rows[:limit], rows[limit - 1] if len(rows) > limit else None
+
+def _log_filters(**columns):
+    """쿼리스트링 필터 (값이 있는 것만 조건에 추가 -> 해당 인덱스를 탈 수 있게)"""
+    where, binds = [], {}
+    for param, column in columns.items():
+        value = request.args.get(param)
+        if value:
+            where.append(f"{column} = :{param}"); binds[param] = value
+    return where, binds
+
 @app.route('/api/admin/logs', methods=['GET'])
 def get_admin_logs():
+    # ?type=TRACK_TAG&user=...&action=ADD&limit=50&cursor=...
+    try: page = _log_page_args()
+    except ValueError: return jsonify({"error": "잘못된 cursor/limit 입니다."}), 400
     try:
         conn = get_db_connection(); cur = conn.cursor()
-        cur.execute("""
+        where, binds = _log_filters(type="l.target_type", user="l.user_id", action="l.action_type")
+        rows, last = _fetch_log_page(cur, """
             SELECT l.log_id, l.target_type, l.target_id, l.action_type, 
                    l.previous_value, l.new_value, l.created_at, u.nickname
             FROM MODIFICATION_LOGS l
-            LEFT JOIN USERS u ON l.user_id = u.user_id
-            ORDER BY l.created_at DESC
-            FETCH FIRST 50 ROWS ONLY
-        """)
-        rows = cur.fetchall()
+            LEFT JOIN USERS u ON l.user_id = u.user_id""", where, binds, page)
         logs = [{"id":r[0], "type":r[1], "target":r[2], "action":r[3], "prev":r[4], "new":r[5], "date":r[6].strftime("%Y-%m-%d %H:%M:%S") if r[6] else "", "user":r[7] or "Unknown"} for r in rows]
-        return jsonify(logs)
+        res = jsonify(logs)
+        if last: res.headers['X-Next-Cursor'] = _encode_log_cursor(last[6], last[0])
+        return res
     except Exception as e: return jsonify({"error": str(e)}), 500
 
 @app.route('/api/admin/update-movies', methods=['POST'])
@@ -58,6 +133,32 @@ def admin_update_movies():
     try: return jsonify({"message": update_box_office_data()})
     except Exception as e: return jsonify({"error": str(e)}), 500
 
+# 곡 일괄 등록 (곡 ID/URL 목록 또는 플레이리스트 URL)
+@app.route('/api/admin/import-tracks', methods=['POST'])
+def api_import_tracks():
+    d = request.get_json(force=True, silent=True) or {}
+    admin_id = d.get('admin_id')
+    try:
+        conn = get_db_connection(); cur = conn.cursor()
+        if not user_auth.is_admin(cur, admin_id):
+            return jsonify({"error": "관리자 권한이 필요합니다."}), 403
+
+        headers = get_spotify_headers()
+        ids = [extract_spotify_id(t) for t in d.get('ids', [])]
+        if d.get('playlist_url'):
+            playlist_id = (extract_spotify_id(d['playlist_url']) or '').split(':')[-1]
+            playlist_ids = fetch_playlist_track_ids(playlist_id, headers)
+            if playlist_ids is None: return jsonify({"error": "플레이리스트를 가져오지 못했습니다."}), 502
+            ids += playlist_ids
+        ids = [t.split(':')[-1] for t in ids if t]
+        if not ids: return jsonify({"error": "곡 ID가 없습니다."}), 400
+
+        results, timings = save_tracks_bulk(ids, conn, headers)
+        summary = {}
+        for r in results.values(): summary[r["status"]] = summary.get(r["status"], 0) + 1
+        return jsonify({"summary": summary, "timings": timings, "results": results})
+    except Exception as e: return jsonify({"error": str(e)}), 500
+
 # [NEW] 유저 밴/언밴 API
 @app.route('/api/admin/ban', methods=['POST'])
 def api_ban_user():
@@ -69,9 +170,7 @@ def api_ban_user():
         conn = get_db_connection(); cur = conn.cursor()
         
         # 1. 관리자 권한 확인
-        cur.execute("SELECT role FROM USERS WHERE user_id=:1", [admin_id])
-        row = cur.fetchone()
-        if not row or row[0] != 'admin':
+        if not user_auth.is_admin(cur, admin_id):
             return jsonify({"error": "관리자 권한이 필요합니다."}), 403
 
         # 2. 대상 유저 상태 토글
@@ -84,29 +183,86 @@ def api_ban_user():
         
         # 로그 기록
         action = "BAN" if new_status == 1 else "UNBAN"
-        cur.execute("INSERT INTO MODIFICATION_LOGS (target_type, target_id, action_type, new_value, user_id) VALUES ('USER_BAN', :1, :2, :3, :4)", 
-                    [target_user_id, action, str(new_status), admin_id])
-        
-        conn.commit()
+        audit_log.commit(conn, [audit_log.make_entry('USER_BAN', target_user_id, action, new_value=str(new_status), user_id=admin_id)])
+        user_auth.invalidate(target_user_id)
         msg = f"유저의 권한을 {'박탈(차단)' if new_status==1 else '복구'}했습니다."
         return jsonify({"message": msg, "new_status": new_status})
         
     except Exception as e: return jsonify({"error": str(e)}), 500
 
+# SKOS 어휘 리로드 (new_data.ttl 교체 후 재시작 없이 반영)
+# 요청을 받은 워커는 바로 리로드, 나머지 워커는 세대 파일을 보고 SKOS_SYNC_INTERVAL 초 안에 리로드
+@app.route('/api/admin/reload-skos', methods=['POST'])
+def api_reload_skos():
+    d = request.get_json(force=True, silent=True) or {}
+    admin_id = d.get('admin_id')
+    try:
+        conn = get_db_connection(); cur = conn.cursor()
+        if not user_auth.is_admin(cur, admin_id):
+            return jsonify({"error": "관리자 권한이 필요합니다."}), 403
+
+        started = broadcast_reload()
+        msg = "이 워커에서 어휘 리로드를 시작했습니다." if started else "이 워커는 이미 리로드가 진행 중입니다."
+        if SKOS_SYNC_INTERVAL > 0: msg += f" 다른 워커는 {SKOS_SYNC_INTERVAL}초 안에 반영합니다."
+        else: msg += " (SKOS_SYNC_INTERVAL=0: 다른 워커에는 반영되지 않으니 재시작이 필요합니다.)"
+        return jsonify({"message": msg, "skos": skos_status()}), 202
+    except Exception as e: return jsonify({"error": str(e)}), 500
+
+# 캐시/외부 연동 통계 (관리자 모니터링용)
+@app.route('/api/admin/stats', methods=['GET'])
+def api_admin_stats():
+    return jsonify({"spotify_token": get_spotify_token_stats(), "http": http_client.get_http_stats(),
+                    "recommend_pool": recommend_pool.get_pool_stats(), "tag_index": tag_index.get_index_stats(),
+                    "search_cache": search_cache.get_cache_stats(), "render_cache": render_cache.get_render_stats(),
+                    "audit_log": audit_log.get_audit_stats(), "user_auth": user_auth.get_auth_stats(),
+                    "db_pool": get_pool_stats()})
+
+# Spotify 검색 캐시 비우기 / 상한 조정 (관리자)
+def _search_cache_limits(d):
+    """ttl / max_entries / max_bytes -> 0 이상 정수 또는 None (미지정), 형식 오류 시 ValueError"""
+    limits = []
+    for name in ('ttl', 'max_entries', 'max_bytes'):
+        v = d.get(name)
+        if v is not None:
+            if isinstance(v, bool) or not isinstance(v, (int, str)) or not str(v).strip().isdigit(): raise ValueError(name)
+            v = int(v)
+        limits.append(v)
+    return limits
+
+@app.route('/api/admin/search-cache', methods=['POST'])
+def api_admin_search_cache():
+    d = request.get_json(force=True, silent=True) or {}
+    admin_id = d.get('admin_id')
+    try: limits = _search_cache_limits(d)
+    except ValueError as e: return jsonify({"error": f"{e}는 0 이상의 정수여야 합니다."}), 400
+    try:
+        conn = get_db_connection(); cur = conn.cursor()
+        if not user_auth.is_admin(cur, admin_id):
+            return jsonify({"error": "관리자 권한이 필요합니다."}), 403
+
+        if d.get('clear'): search_cache.clear()
+        search_cache.configure(*limits)
+        return jsonify({"message": "검색 캐시 설정 완료", "search_cache": search_cache.get_cache_stats()})
+    except Exception as e: return jsonify({"error": str(e)}), 500
+
+@app.route('/api/admin/skos-status', methods=['GET'])
+def api_skos_status():
+    return jsonify(skos_status())
+
 # [NEW] 곡별 태그 수정 로그 조회 (관리자용, 상세 팝업용)
 @app.route('/api/track/<tid>/logs', methods=['GET'])
 def get_track_logs(tid):
+    # ?user=...&action=ADD&limit=100&cursor=...
+    try: page = _log_page_args(default_limit=100)
+    except ValueError: return jsonify({"error": "잘못된 cursor/limit 입니다."}), 400
     try:
         conn = get_db_connection(); cur = conn.cursor()
-        sql = """
-            SELECT l.created_at, u.user_id, u.nickname, u.is_banned, l.action_type, l.new_value
+        where, binds = _log_filters(user="l.user_id", action="l.action_type")
+        rows, last = _fetch_log_page(cur, """
+            SELECT l.created_at, u.user_id, u.nickname, u.is_banned, l.action_type, l.new_value, l.log_id
             FROM MODIFICATION_LOGS l
-            JOIN USERS u ON l.user_id = u.user_id
-            WHERE l.target_type = 'TRACK_TAG' AND l.target_id = :1
-            ORDER BY l.created_at DESC
-        """
-        cur.execute(sql, [tid])
-        rows = cur.fetchall()
+            JOIN USERS u ON l.user_id = u.user_id""",
+            ["l.target_type = 'TRACK_TAG'", "l.target_id = :tid"] + where, {**binds, "tid": tid}, page)
         
         logs = [{
             "date": r[0].strftime("%Y-%m-%d %H:%M"),
@@ -117,7 +273,9 @@ def get_track_logs(tid):
             "tag": r[5]
         } for r in rows]
         
-        return jsonify(logs)
+        res = jsonify(logs)
+        if last: res.headers['X-Next-Cursor'] = _encode_log_cursor(last[0], last[6])
+        return res
     except Exception as e: return jsonify({"error": str(e)}), 500
 
 
@@ -127,45 +285,20 @@ def get_track_logs(tid):
 @app.route('/api/recommend/context', methods=['GET'])
 def get_context_recommendation():
     try:
-        weather = get_current_weather()
-        holiday = get_today_holiday()
-        target_tags = []
-        message = ""
-
-        if holiday:
-            message = f"오늘은 {holiday}! 이런 분위기 어때요?"
-            target_tags = [holiday, "파티", "기념일"]
-        else:
-            message = f"현재 날씨({weather})에 딱 맞는 무드"
-            target_tags = skos_manager.get_weather_tags(weather) if skos_manager else ["휴식", "기분전환"]
-
+        context = get_context()
+        target_tags, message = context_targets(context)
         recommended_tracks = []
         try:
-            conn = get_db_connection(); cur = conn.cursor()
-            search_tags = [f"tag:{t}" for t in target_tags] if target_tags else ["tag:기분전환"]
-            bind_names = [f":t{i}" for i in range(len(search_tags))]
-            bind_dict = {f"t{i}": t for i, t in enumerate(search_tags)}
-            
-            sql = f"""
-                SELECT DISTINCT t.track_id, t.track_title, t.artist_name, t.image_url, t.preview_url
-                FROM TRACKS t
-                JOIN TRACK_TAGS tt ON t.track_id = tt.track_id
-                WHERE LOWER(tt.tag_id) IN ({','.join(['LOWER(' + b + ')' for b in bind_names])})
-                ORDER BY DBMS_RANDOM.VALUE
-                FETCH FIRST 4 ROWS ONLY
-            """
-            cur.execute(sql, bind_dict)
-            rows = cur.fetchall()
-            for r in rows:
-                recommended_tracks.append({ "id": r[0], "name": r[1], "artists": [{"name": r[2]}], "album": { "images": [{"url": r[3] or "img/playlist-placeholder.png"}] }, "preview_url": r[4] })
+            # 태그 집합별 후보 풀(메모리)에서 무작위 추출
+            rows = recommend_pool.sample_tracks(context_search_tags(target_tags), 4)
+            recommended_tracks = context_track_items(rows)
         except: pass
-
-        return jsonify({ "message": message, "weather": weather, "holiday": holiday, "tags": target_tags, "tracks": recommended_tracks })
+        return jsonify(context_response(context, target_tags, message, recommended_tracks))
     except Exception as e: return jsonify({"error": str(e)}), 500
 
 @app.route('/api/data/box-office.ttl', methods=['GET'])
 def get_box_office_ttl():
-    try:
+    def render():
         conn = get_db_connection(); cur = conn.cursor()
         cur.execute("""
             SELECT m.movie_id, m.title, m.rank, m.poster_url, 
@@ -188,86 +321,100 @@ def get_box_office_ttl():
             if r[4]:
                 tid = r[4]
                 ttl_parts.append(f"""<https://knowledgemap.kr/resource/track/{tid}> a schema:MusicRecording ; schema:name "{r[5]}" ; schema:byArtist "{r[6]}" ; schema:image "{r[7] or img}" ; komc:featuredIn <https://knowledgemap.kr/resource/movie/{mid}> .""")
-        return make_response("\n".join(ttl_parts), 200, {'Content-Type': 'text/turtle; charset=utf-8'})
+        return "\n".join(ttl_parts)
+    try:
+        # 박스오피스/OST 갱신 시에만 다시 렌더링, 그 외에는 캐시 + ETag(304)
+        return render_cache.cached_response(render_cache.BOX_OFFICE_KEY, render, 'text/turtle; charset=utf-8')
     except Exception as e: return make_response(f"# Error: {str(e)}", 500, {'Content-Type': 'text/turtle'})
 
+# 전체 데이터 내보내기 (N-Triples / Turtle 스트리밍, ?since=YYYY-MM-DD[THH:MM:SS] 증분, ?gzip=1 압축)
+# since는 MODIFICATION_LOGS 기준 -> 태그/OST 편집이 있었던 곡/영화만 포함
+# (일괄 가져오기로 새로 들어온 곡, 조회수/메타데이터 갱신, 박스오피스 순위/포스터 갱신은 로그가 없어 빠짐 -> 전체 동기화는 since 없이)
+@app.route('/api/data/export.<fmt>', methods=['GET'])
+def export_data(fmt):
+    if fmt not in ('nt', 'ttl'): return jsonify({"error": "지원하지 않는 형식입니다. (nt, ttl)"}), 400
+    since = None
+    if request.args.get('since'):
+        try: since = datetime.fromisoformat(request.args['since'])
+        except ValueError: return jsonify({"error": "since 형식 오류 (예: 2024-01-31T00:00:00)"}), 400
+    compress = request.args.get('gzip') == '1'
+    content_type = 'application/n-triples; charset=utf-8' if fmt == 'nt' else 'text/turtle; charset=utf-8'
+    headers = {'Content-Disposition': f'attachment; filename="knowledgemap.{fmt}"'}
+    if compress: headers['Content-Encoding'] = 'gzip'
+    if since: headers['X-Export-Since-Scope'] = ",".join(export_rdf.SINCE_SCOPE)
+    # 요청 컨텍스트(g.db)를 쓰지 않고 생성기 안에서 별도 커넥션 사용 -> 응답 스트리밍 중에도 안전
+    return Response(export_rdf.iter_export(fmt, since, compress), headers=headers, content_type=content_type)
+
 # =========================================================
 # 3. 검색 API
 # =========================================================
 
+def _search_tags_db(conn, search_tags, tag_keyword, after=None, limit=SEARCH_PAGE_SIZE):
+    cur = conn.cursor()
+    cur.execute(*tag_search.search_sql(search_tags, tag_keyword, after, limit))
+    return tag_search.sql_page_items(cur.fetchall(), limit)
+
+def _search_db_source(tag_keyword, after):
+    """DB(태그) 검색 소스 -> (items, next_after). 요청 컨텍스트 밖 스레드에서 실행"""
+    search_tags = tag_search.expand_tags(tag_keyword)
+    # 메모리 역색인에서 조회 (아직 적재 전이면 DB 조회)
+    result = tag_index.search_page(search_tags, tag_keyword, after, SEARCH_PAGE_SIZE)
+    if result is not None:
+        page, next_after = result
+        return tag_search.index_page_items(page), next_after
+    with acquire_connection() as conn:
+        return _search_tags_db(conn, search_tags, tag_keyword, after)
+
+def _search_spotify_source(q, offset, timeout):
+    def load():
+        headers = get_spotify_headers(); params = {"q": q, "type": "track", "limit": "20", "offset": offset, "market": "KR"}
+        res = http_client.get(f"{SPOTIFY_API_BASE}/search", headers=headers, params=params, timeout=(HTTP_CONNECT_TIMEOUT, timeout), retries=0)
+        if res.status_code != 200: return None  # 실패 응답은 캐시하지 않음 (-> 소스 실패, partial)
+        return res.json().get('tracks', {}).get('items', []), len(res.content)
+    # 같은 검색어는 캐시에서, 동시에 들어온 같은 검색어는 한 번만 호출
+    # 실패(200 이외) 시 None -> _timed 결과도 None 이므로 partial=true, 결과가 0건이면 []
+    return search_cache.get_or_fetch(search_cache.make_key(q, offset, "KR"), load, wait_timeout=timeout)
+
+def _timed(fn, *args):
+    """(결과, 소요 ms) - 실패 시 결과 None"""
+    started = time.perf_counter()
+    try: result = fn(*args)
+    except Exception as e:
+        print(f"❌ [Search] {fn.__name__} 에러: {e}")
+        result = None
+    return result, (time.perf_counter() - started) * 1000
+
 @app.route('/api/search', methods=['GET'])
 def api_search():
     q = request.args.get('q', '')
     offset = int(request.args.get('offset', '0'))
     if not q: return jsonify({"error": "No query"}), 400
-    db_items = []
-    
-    # 태그 검색인 경우
+    # DB 결과는 키셋 커서로 SEARCH_PAGE_SIZE개씩 (offset은 Spotify 페이지용)
+    try: after = tag_search.decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except Exception: return jsonify({"error": "Invalid cursor"}), 400
+
+    # DB(태그 검색일 때)와 Spotify를 동시에 조회하고, 마감 시간까지 도착한 결과만 사용
+    futures = {"spotify": _search_executor.submit(_timed, _search_spotify_source, q, offset, SEARCH_DEADLINE_SEC)}
     if q.startswith('tag:'):
-        try:
-            tag_keyword = q.replace('tag:', '').strip()
-            
-            # 1. 검색어 확장 (SKOS)
-            search_tags = [tag_keyword]
-            if skos_manager:
-                # get_narrower_tags가 이제 ['JPop', 'J-Pop', 'Jpop', '제이팝'] 다 줍니다.
-                expanded = skos_manager.get_narrower_tags(tag_keyword)
-                if expanded: search_tags = expanded
-            
-            print(f"🔍 [Search] '{tag_keyword}' 확장 결과: {search_tags}") # 디버그 로그
-
-            conn = get_db_connection(); cur = conn.cursor()
-            
-            # 2. 쿼리 생성 (대소문자 무시 비교)
-            # tag: 접두어를 붙여서 비교
-            bind_names = [f":t{i}" for i in range(len(search_tags))]
-            bind_dict = {f"t{i}": f"tag:{t}" for i, t in enumerate(search_tags)}
-            
-            sql = f"""
-                SELECT DISTINCT t.track_id, t.track_title, t.artist_name, t.image_url, t.preview_url, t.views, tt.tag_id
-                FROM TRACKS t 
-                JOIN TRACK_TAGS tt ON t.track_id = tt.track_id
-                WHERE LOWER(tt.tag_id) IN ({','.join(['LOWER(' + b + ')' for b in bind_names])})
-            """
-            cur.execute(sql, bind_dict)
-            rows = cur.fetchall()
-            
-            # ... (결과 가공 로직 기존과 동일) ...
-            temp_tracks = {}
-            original_tag_clean = tag_keyword.lower()
-            for r in rows:
-                tid = r[0]
-                # 태그 일치도에 따라 점수 부여
-                current_tag_suffix = r[6].replace('tag:', '').lower()
-                views = r[5] or 0
-                score = views
-                if current_tag_suffix == original_tag_clean: score += 10000
-                elif current_tag_suffix in [s.lower() for s in search_tags]: score += 5000
-                
-                if tid not in temp_tracks or score > temp_tracks[tid]['score']:
-                    temp_tracks[tid] = { "data": { "id": r[0], "name": f"[추천] {r[1]}", "artists": [{"name": r[2]}], "album": { "name": "Unknown", "images": [{"url": r[3] or "img/playlist-placeholder.png"}] }, "preview_url": r[4] }, "score": score }
-            
-            sorted_tracks = sorted(temp_tracks.values(), key=lambda x: x['score'], reverse=True)
-            db_items = [t['data'] for t in sorted_tracks]
-
-        except Exception as e: 
-            print(f"❌ DB Search Error: {e}")
-            import traceback; traceback.print_exc()
-
-    # ... (Spotify 검색 및 병합 로직 기존과 동일) ...
-    spotify_items = []
-    try:
-        headers = get_spotify_headers(); params = {"q": q, "type": "track", "limit": "20", "offset": offset, "market": "KR"}
-        res = requests.get(f"{SPOTIFY_API_BASE}/search", headers=headers, params=params)
-        if res.status_code == 200: spotify_items = res.json().get('tracks', {}).get('items', [])
-    except: pass
+        futures["db"] = _search_executor.submit(_timed, _search_db_source, q.replace('tag:', '').strip(), after)
+    done, not_done = wait(futures.values(), timeout=SEARCH_DEADLINE_SEC)
+
+    results, timings = {}, []
+    for name, fut in futures.items():
+        if fut in done:
+            results[name], ms = fut.result()
+            timings.append(f"{name};dur={ms:.1f}")
+        else:
+            fut.cancel()
+            timings.append(f'{name};dur={SEARCH_DEADLINE_SEC * 1000:.0f};desc="timeout"')
+    # 마감 초과 또는 실패한 소스가 있으면 partial
+    partial = bool(not_done) or any(results[name] is None for name in results)
+    db_items, next_after = results.get("db") or ([], None)
+    spotify_items = results.get("spotify") or []
 
-    seen_ids = set(); final_items = []
-    for item in db_items:
-        if item['id'] not in seen_ids: final_items.append(item); seen_ids.add(item['id'])
-    for item in spotify_items:
-        if item['id'] not in seen_ids: final_items.append(item); seen_ids.add(item['id'])
-    return jsonify({ "tracks": { "items": final_items, "total": len(final_items), "offset": offset } })
+    res = jsonify(tag_search.search_response(tag_search.merge_results(db_items, spotify_items), offset, next_after, partial))
+    res.headers['Server-Timing'] = ", ".join(timings)
+    return res
 
 # [태그 추가 API] 곡 자동 저장 + SKOS 상위 태그 저장
 @app.route('/api/track/<tid>/tags', methods=['POST'])
@@ -277,9 +424,7 @@ def api_add_tags(tid):
     try:
         conn = get_db_connection(); cur = conn.cursor()
         
-        cur.execute("SELECT is_banned FROM USERS WHERE user_id=:1", [uid])
-        user_row = cur.fetchone()
-        if user_row and user_row[0] == 1:
+        if user_auth.is_banned(cur, uid):
             return jsonify({"error": "태그 편집 권한이 박탈된 계정입니다."}), 403
 
         # 🚨 [필수] 곡 정보 자동 저장
@@ -289,31 +434,37 @@ def api_add_tags(tid):
             res = save_track_details(tid, cur, get_spotify_headers(), [])
             if not res: return jsonify({"error": "곡 정보 저장 실패"}), 404
 
+        skos = get_skos_manager()  # 요청 처리 중 리로드되어도 같은 버전 사용
+        # 저장할 태그 목록 (원본 + 상위 개념), 대소문자만 다른 중복은 먼저 입력된 것 하나로
+        targets = {}
         for t in tags:
             t = t.strip()
             if not t: continue
             if not t.startswith('tag:'): t = f"tag:{t}"
-            
-            # 저장할 태그 목록 (원본 + 상위 개념)
-            targets = {t}
-            if skos_manager: 
+            expanded = [t]
+            if skos:
                 # tag: 제외한 키워드로 상위 개념 검색
-                keyword = t.replace('tag:', '')
-                broader = skos_manager.get_broader_tags(keyword)
-                for b in broader: targets.add(f"tag:{b}")
-            
-            print(f"🏷️ [Tagging] '{t}' -> 저장될 태그들: {targets}") # 로그
-
-            for final_tag in targets:
-                try: 
-                    cur.execute("MERGE INTO TRACK_TAGS t USING (SELECT :1 a, :2 b FROM dual) s ON (t.track_id=s.a AND t.tag_id=s.b) WHEN NOT MATCHED THEN INSERT (track_id, tag_id) VALUES (s.a, s.b)", [tid, final_tag])
-                    cur.execute("INSERT INTO MODIFICATION_LOGS (target_type, target_id, action_type, new_value, user_id) VALUES ('TRACK_TAG', :1, 'ADD', :2, :3)", [tid, final_tag, uid])
-                except Exception as e: 
-                    print(f"⚠️ 태그 저장 에러 무시 ({final_tag}): {e}")
-                    pass
-        
-        conn.commit()
-        return jsonify({"message": "Saved"})
+                expanded += [f"tag:{b}" for b in skos.get_broader_tags(t.replace('tag:', ''))]
+            for final_tag in expanded: targets.setdefault(normalize_tag_key(final_tag), final_tag)
+            print(f"🏷️ [Tagging] '{t}' -> 저장될 태그들: {expanded}") # 로그
+        targets = list(targets.values())
+        if not targets: return jsonify({"message": "Saved", "saved": [], "failed": []})
+
+        # 태그 저장 / 로그 기록을 각각 executemany 한 번으로 (실패한 행만 골라서 보고)
+        cur.executemany("MERGE INTO TRACK_TAGS t USING (SELECT :1 a, :2 b FROM dual) s ON (t.track_id=s.a AND t.tag_id=s.b) WHEN NOT MATCHED THEN INSERT (track_id, tag_id) VALUES (s.a, s.b)",
+                        [[tid, t] for t in targets], batcherrors=True)
+        errors = {e.offset: e.message for e in cur.getbatcherrors()}
+        written_tags = [t for i, t in enumerate(targets) if i not in errors]
+        failed = [{"tag": targets[i], "error": msg} for i, msg in errors.items()]
+        for f in failed: print(f"⚠️ 태그 저장 실패 ({f['tag']}): {f['error']}")
+        audit_log.commit(conn, [audit_log.make_entry('TRACK_TAG', tid, 'ADD', new_value=t, user_id=uid) for t in written_tags])
+        tag_index.add_track_tags(tid, written_tags, cur)
+        recommend_pool.add_track_tags(tid, written_tags, cur)
+        render_cache.invalidate(render_cache.track_key(tid))
+        # 전부 실패 400 / 일부 실패 207 (상태 코드만 보는 클라이언트가 성공으로 처리하지 않도록)
+        if failed and not written_tags: return jsonify({"error": "태그 저장 실패", "saved": [], "failed": failed}), 400
+        if failed: return jsonify({"message": "Partially saved", "saved": written_tags, "failed": failed}), 207
+        return jsonify({"message": "Saved", "saved": written_tags, "failed": failed})
     except Exception as e: return jsonify({"error": str(e)}), 500
 
 # =========================================================
@@ -325,7 +476,9 @@ def api_signup():
     try:
         conn = get_db_connection(); cur = conn.cursor()
         cur.execute("INSERT INTO USERS (user_id, password, nickname, role, is_banned) VALUES (:1, :2, :3, 'user', 0)", [d['id'], generate_password_hash(d['password']), d['nickname']])
-        conn.commit(); return jsonify({"message": "Success"})
+        conn.commit()
+        user_auth.invalidate(d['id'])  # 가입 전에 조회돼 '없는 유저'로 캐시된 경우 (모든 워커)
+        return jsonify({"message": "Success"})
     except: return jsonify({"error": "Fail"}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
@@ -363,7 +516,7 @@ def api_user_update():
             file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
             img_url = f"/uploads/{filename}"
             cur.execute("UPDATE USERS SET profile_img=:1 WHERE user_id=:2", [img_url, uid])
-        conn.commit(); return jsonify({"message": "Updated", "image_url": img_url})
+        conn.commit(); user_auth.invalidate(uid); return jsonify({"message": "Updated", "image_url": img_url})
     except Exception as e: return jsonify({"error": str(e)}), 500
 
 @app.route('/api/spotify-token', methods=['GET'])
@@ -431,16 +584,9 @@ def api_up_ost(mid):
         """, {'mid': movie_id, 'tid': tid})
         
         # 로그 테이블에도 기록
-        cur.execute("""
-            INSERT INTO MODIFICATION_LOGS (target_type, target_id, action_type, previous_value, new_value, user_id) 
-            VALUES ('MOVIE_OST', :1, 'UPDATE', 'Unknown', :2, :3)
-        """, [movie_id, f"Track:{track_name}", uid])
-
-        conn.commit()
+        audit_log.commit(conn, [audit_log.make_entry('MOVIE_OST', movie_id, 'UPDATE', new_value=f"Track:{track_name}", previous_value='Unknown', user_id=uid)])
+        render_cache.invalidate(render_cache.BOX_OFFICE_KEY, render_cache.track_key(tid))
         print("   -> ✨ 모든 과정 성공! 응답 전송.\n")
-        
-        cur.close()
-        conn.close()
 
         return jsonify({"message": "OST가 성공적으로 변경되었습니다.", "new_track": track_name})
 
@@ -462,8 +608,7 @@ def api_delete_tag(tid):
         conn = get_db_connection(); cur = conn.cursor()
 
         # 1. 유저 권한 확인 (밴 여부)
-        cur.execute("SELECT is_banned, role FROM USERS WHERE user_id=:1", [uid])
-        user_row = cur.fetchone()
+        user_row = user_auth.get_user_auth(cur, uid)
         if not user_row: return jsonify({"error": "유저 정보 없음"}), 404
         if user_row[0] == 1: return jsonify({"error": "권한이 박탈된 계정입니다."}), 403
 
@@ -475,9 +620,10 @@ def api_delete_tag(tid):
         
         if cur.rowcount > 0:
             # 3. 로그 기록 (DELETE 액션)
-            cur.execute("INSERT INTO MODIFICATION_LOGS (target_type, target_id, action_type, previous_value, user_id) VALUES ('TRACK_TAG', :1, 'DELETE', :2, :3)", 
-                        [tid, tag_to_delete, uid])
-            conn.commit()
+            audit_log.commit(conn, [audit_log.make_entry('TRACK_TAG', tid, 'DELETE', previous_value=tag_to_delete, user_id=uid)])
+            tag_index.remove_track_tag(tid, tag_to_delete)
+            recommend_pool.remove_track_tag(tid, tag_to_delete)
+            render_cache.invalidate(render_cache.track_key(tid))
             return jsonify({"message": "Deleted"})
         else:
             return jsonify({"error": "태그를 찾을 수 없습니다."}), 404
@@ -496,16 +642,18 @@ def api_get_tags(tid):
 
 @app.route('/api/track/<track_id>.ttl', methods=['GET'])
 def get_track_detail_ttl(track_id):
-    try:
+    def render():
         conn = get_db_connection(); cur = conn.cursor()
         cur.execute("SELECT track_title, artist_name, album_id, preview_url, image_url, bpm, music_key, duration, views FROM TRACKS WHERE track_id=:1", [track_id])
         row = cur.fetchone()
-        if not row: return "Not Found", 404
+        if not row: raise LookupError(track_id)
         cur.execute("SELECT tag_id FROM TRACK_TAGS WHERE track_id = :1", [track_id])
         tags = [r[0] for r in cur.fetchall()]
         tag_str = ", ".join(tags) if tags else "tag:Music"
-        ttl = f"""@prefix schema: <http://schema.org/> .\n@prefix komc: <https://knowledgemap.kr/komc/def/> .\n<https://knowledgemap.kr/resource/track/{track_id}> a schema:MusicRecording ;\n    schema:name "{row[0]}" ;\n    schema:byArtist "{row[1]}" ;\n    schema:image "{row[4]}" ;\n    komc:playCount "{row[8]}"^^<http://www.w3.org/2001/XMLSchema#integer> ;\n    komc:relatedTag {tag_str} ."""
-        return make_response(ttl, 200, {'Content-Type': 'text/turtle; charset=utf-8'})
+        return f"""@prefix schema: <http://schema.org/> .\n@prefix komc: <https://knowledgemap.kr/komc/def/> .\n<https://knowledgemap.kr/resource/track/{track_id}> a schema:MusicRecording ;\n    schema:name "{row[0]}" ;\n    schema:byArtist "{row[1]}" ;\n    schema:image "{row[4]}" ;\n    komc:playCount "{row[8]}"^^<http://www.w3.org/2001/XMLSchema#integer> ;\n    komc:relatedTag {tag_str} ."""
+    try:
+        return render_cache.cached_response(render_cache.track_key(track_id), render, 'text/turtle; charset=utf-8')
+    except LookupError: return "Not Found", 404
     except Exception as e: return str(e), 500
 
 @app.route('/uploads/<path:filename>')
@@ -1,55 +1,153 @@
+import os
+import sys
+import json
+import time
 import oracledb
 import config
 from skos_manager import SkosManager
+from utils import normalize_tag_key
+
+# 기존 태그에 상위 개념(Broader) 태그 일괄 적용 (배치, 재시작 가능)
+# - 상위 개념 계산은 곡-태그 행이 아니라 서로 다른 태그(TAGS)마다 한 번
+# - (태그 키 -> 상위 태그) 쌍을 임시 테이블(GTT)에 올린 뒤, track_id 범위별 MERGE 한 번으로 누락분만 추가
+# - 배치마다 커밋 + 체크포인트 파일 기록 -> 중단 후 다시 실행하면 이어서 진행 (어휘가 바뀌면 처음부터)
+# 사용법: python apply_skos.py [--dry-run] [--reset] [--batch 5000]
+
+BATCH_TRACKS = int(sys.argv[sys.argv.index("--batch") + 1]) if "--batch" in sys.argv else 5000
+DRY_RUN = "--dry-run" in sys.argv
+RESET = "--reset" in sys.argv
+CHECKPOINT_FILE = os.path.join(config.BASE_DIR, "apply_skos.checkpoint.json")
+START_KEY = " "  # Oracle은 '' 를 NULL로 취급하므로 모든 track_id보다 작은 공백 문자로 시작
+
+STAGE_DDL = """
+    CREATE GLOBAL TEMPORARY TABLE SKOS_BROADER_STAGE (
+        child_key  VARCHAR2(400) NOT NULL,
+        parent_key VARCHAR2(400) NOT NULL,
+        parent_id  VARCHAR2(400) NOT NULL,
+        parent_num NUMBER
+    ) ON COMMIT PRESERVE ROWS"""
+STAGE_ADD_PARENT_NUM = "ALTER TABLE SKOS_BROADER_STAGE ADD (parent_num NUMBER)"  # 이전 버전에서 만든 임시 테이블용
+
+# 범위 안 곡들의 (곡, 상위 태그) 중 아직 없는 것 (대소문자만 다른 태그는 같은 태그로 봄)
+# - 상위 태그 존재 여부는 tag_num으로 비교 -> (tag_num, track_id) 인덱스 조회
+# - parent_num이 NULL(TAGS에 아직 없는 상위 태그)이면 어떤 곡에도 없으므로 NOT EXISTS 참
+DELTA_SQL = """
+    SELECT DISTINCT tt.track_id, s.parent_id
+    FROM TRACK_TAGS tt
+    JOIN TAGS g ON g.tag_num = tt.tag_num
+    JOIN SKOS_BROADER_STAGE s ON s.child_key = g.tag_key
+    WHERE tt.track_id > :lo AND tt.track_id <= :hi
+      AND NOT EXISTS (SELECT 1 FROM TRACK_TAGS x
+                      WHERE x.tag_num = s.parent_num AND x.track_id = tt.track_id)
+"""
+
+NEXT_BOUNDARY_SQL = """
+    SELECT MAX(track_id), COUNT(*) FROM (
+        SELECT DISTINCT track_id FROM TRACK_TAGS
+        WHERE track_id > :lo ORDER BY track_id FETCH FIRST :n ROWS ONLY
+    )
+"""
+
+
+def load_checkpoint(version):
+    if RESET or not os.path.exists(CHECKPOINT_FILE): return {"version": version, "last_track_id": START_KEY, "added": 0}
+    with open(CHECKPOINT_FILE, encoding="utf-8") as f:
+        cp = json.load(f)
+    if cp.get("version") != version:
+        print("   ⚠️ 어휘가 바뀌어 체크포인트를 무시하고 처음부터 진행합니다.")
+        return {"version": version, "last_track_id": START_KEY, "added": 0}
+    print(f"   ⏩ 체크포인트에서 이어서 진행: track_id > '{cp['last_track_id']}' (지금까지 {cp['added']}개 추가)")
+    return cp
+
+
+def save_checkpoint(cp):
+    tmp = CHECKPOINT_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cp, f, ensure_ascii=False)
+    os.replace(tmp, CHECKPOINT_FILE)
+
+
+def build_stage(cur, skos):
+    """서로 다른 태그마다 상위 개념 계산 -> 임시 테이블 적재, 쌍 개수 반환"""
+    try: cur.execute(STAGE_DDL)
+    except oracledb.DatabaseError as e:
+        if "ORA-00955" not in str(e): raise
+        try: cur.execute(STAGE_ADD_PARENT_NUM)
+        except oracledb.DatabaseError as e2:
+            if "ORA-01430" not in str(e2): raise
+    cur.execute("DELETE FROM SKOS_BROADER_STAGE")
+
+    cur.execute("SELECT tag_key, tag_id, tag_num FROM TAGS")
+    tags = cur.fetchall()
+    tag_nums = {tag_key: tag_num for tag_key, tag_id, tag_num in tags}
+    pairs = set()
+    for tag_key, tag_id, tag_num in tags:
+        for parent in skos.get_broader_tags(tag_id):
+            parent_id = parent if parent.startswith("tag:") else f"tag:{parent}"
+            parent_key = normalize_tag_key(parent_id)
+            if parent_key != tag_key: pairs.add((tag_key, parent_key, parent_id, tag_nums.get(parent_key)))
+    cur.executemany("INSERT INTO SKOS_BROADER_STAGE (child_key, parent_key, parent_id, parent_num) VALUES (:1, :2, :3, :4)", sorted(pairs, key=lambda p: p[:3]))
+    return len(pairs)
+
 
 def apply_skos_to_existing_tags():
-    print("🚀 [SKOS] 기존 태그에 상위 개념(Broader) 적용 시작...")
-    
-    # [수정] 여기가 핵심입니다. 새 파일명(new_data.ttl)을 읽습니다.
+    mode = "DRY-RUN (변경 없음)" if DRY_RUN else f"배치 {BATCH_TRACKS}곡"
+    print(f"🚀 [SKOS] 기존 태그에 상위 개념(Broader) 적용 시작... ({mode})")
+
     try:
-        skos = SkosManager("new_data.ttl")
+        skos = SkosManager(config.SKOS_FILE)
     except Exception as e:
         print(f"❌ SKOS 파일 로드 실패: {e}")
         return
 
     conn = None
     try:
-        conn = oracledb.connect(
-            user=config.DB_USER,
-            password=config.DB_PASSWORD,
-            dsn=config.DB_DSN
-        )
+        conn = oracledb.connect(user=config.DB_USER, password=config.DB_PASSWORD, dsn=config.DB_DSN)
         cur = conn.cursor()
 
-        print("   📂 DB에서 태그 목록 조회 중...")
-        cur.execute("SELECT track_id, tag_id FROM TRACK_TAGS")
-        existing_tags = cur.fetchall()
-        
-        added_count = 0
-        
-        for track_id, tag_id in existing_tags:
-            broader_tags = skos.get_broader_tags(tag_id)
-            
-            for parent_tag in broader_tags:
-                parent_tag_id = f"tag:{parent_tag}" if not parent_tag.startswith("tag:") else parent_tag
-                try:
-                    cur.execute("""
-                        MERGE INTO TRACK_TAGS t 
-                        USING (SELECT :1 a, :2 b FROM dual) s 
-                        ON (t.track_id=s.a AND t.tag_id=s.b) 
-                        WHEN NOT MATCHED THEN INSERT (track_id, tag_id) VALUES (s.a, s.b)
-                    """, [track_id, parent_tag_id])
-                    
-                    if cur.rowcount > 0:
-                        print(f"   ➕ [확장] {tag_id} -> {parent_tag_id} 추가됨")
-                        added_count += 1
-                except: pass
-
-        conn.commit()
-        print(f"\n🎉 작업 완료! 총 {added_count}개의 상위 태그가 자동으로 추가되었습니다.")
+        print("   📂 태그별 상위 개념 계산 중...")
+        n_pairs = build_stage(cur, skos)
+        print(f"   ✅ (태그 -> 상위 태그) {n_pairs}쌍 준비")
+        if not n_pairs: return
+
+        cp = load_checkpoint(skos.version) if not DRY_RUN else {"version": skos.version, "last_track_id": START_KEY, "added": 0}
+        per_parent = {}
+        started = time.perf_counter()
+        while True:
+            cur.execute(NEXT_BOUNDARY_SQL, {"lo": cp["last_track_id"], "n": BATCH_TRACKS})
+            hi, n_tracks = cur.fetchone()
+            if not n_tracks: break
+            binds = {"lo": cp["last_track_id"], "hi": hi}
+
+            if DRY_RUN:
+                cur.execute(f"SELECT parent_id, COUNT(*) FROM ({DELTA_SQL}) GROUP BY parent_id", binds)
+                for parent_id, cnt in cur:
+                    per_parent[parent_id] = per_parent.get(parent_id, 0) + cnt
+                    cp["added"] += cnt
+            else:
+                cur.execute(f"""
+                    MERGE INTO TRACK_TAGS t
+                    USING ({DELTA_SQL}) s
+                    ON (t.track_id = s.track_id AND t.tag_id = s.parent_id)
+                    WHEN NOT MATCHED THEN INSERT (track_id, tag_id) VALUES (s.track_id, s.parent_id)
+                """, binds)
+                cp["added"] += cur.rowcount
+                conn.commit()
+
+            cp["last_track_id"] = hi
+            if not DRY_RUN: save_checkpoint(cp)
+            print(f"   ... track_id <= '{hi}' 까지 처리 ({n_tracks}곡, 누적 {cp['added']}개, {time.perf_counter() - started:.1f}s)")
+
+        if DRY_RUN:
+            print(f"\n🔎 [DRY-RUN] 추가될 상위 태그 {cp['added']}개")
+            for parent_id, cnt in sorted(per_parent.items(), key=lambda x: -x[1])[:20]:
+                print(f"   {parent_id:<30} +{cnt}")
+        else:
+            if os.path.exists(CHECKPOINT_FILE): os.remove(CHECKPOINT_FILE)
+            print(f"\n🎉 작업 완료! 총 {cp['added']}개의 상위 태그가 자동으로 추가되었습니다.")
 
     except Exception as e:
-        print(f"❌ DB 오류: {e}")
+        print(f"❌ DB 오류: {e}\n   👉 다시 실행하면 마지막 체크포인트부터 이어서 진행합니다.")
     finally:
         if conn: conn.close()
 
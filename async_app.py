@@ -0,0 +1,165 @@
+import time
+import asyncio
+import httpx
+from quart import Quart, request, jsonify
+
+import config
+from config import SPOTIFY_API_BASE, SKOS_FILE, SKOS_WATCH_INTERVAL, SKOS_SYNC_INTERVAL, TAG_INDEX_RECONCILE_INTERVAL, SEARCH_PAGE_SIZE, SEARCH_DEADLINE_SEC, HTTP_CONNECT_TIMEOUT
+import database
+from database import init_db_pool, init_async_pool, close_async_pool
+from skos_manager import init_skos_manager, start_skos_watcher
+from utils import get_spotify_headers
+from context_provider import get_context, start_context_provider, context_targets, context_search_tags, context_track_items, context_response
+import recommend_pool
+import tag_index
+import search_cache
+import tag_search
+
+# I/O 대기가 대부분인 조회 API의 asyncio 버전 (Quart + python-oracledb asyncio 풀 + httpx)
+# - /api/search, /api/recommend/context, GET /api/track/<tid>/tags
+# - JSON 응답 형식은 app.py와 동일 (검색/추천 응답 구성은 tag_search.py, context_provider.py를 같이 사용)
+# - 요청마다 스레드를 잡지 않으므로 동시 요청 수천 개가 작은 커넥션 풀(ASYNC_DB_POOL_MAX)을 나눠 씀
+# - 역색인/추천 풀 재구성, 컨텍스트 갱신 같은 백그라운드 작업은 기존처럼 스레드 + 동기 풀(init_db_pool)
+# 실행: hypercorn async_app:app -b 0.0.0.0:5001  (또는 python async_app.py)
+
+try:
+    init_skos_manager(SKOS_FILE)
+    print(f"✅ SKOS Manager Loaded Successfully (from {SKOS_FILE}).")
+except Exception as e:
+    print(f"⚠️ SKOS Load Error: {e}")
+
+app = Quart(__name__)
+_http = None
+
+
+@app.before_serving
+async def startup():
+    global _http
+    init_async_pool()
+    init_db_pool()
+    start_skos_watcher(SKOS_WATCH_INTERVAL, SKOS_SYNC_INTERVAL)  # Flask 워커의 관리자 리로드도 따라감
+    start_context_provider()
+    tag_index.start_tag_index(TAG_INDEX_RECONCILE_INTERVAL)
+    _http = httpx.AsyncClient(timeout=httpx.Timeout(config.HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                              limits=httpx.Limits(max_connections=config.ASYNC_HTTP_MAX_CONNECTIONS,
+                                                  max_keepalive_connections=config.HTTP_POOL_MAXSIZE))
+
+
+@app.after_serving
+async def shutdown():
+    if _http is not None: await _http.aclose()
+    await close_async_pool()
+
+
+@app.after_request
+async def add_cors_headers(res):
+    # app.py의 CORS(app, expose_headers=...)와 같은 헤더
+    res.headers['Access-Control-Allow-Origin'] = '*'
+    res.headers['Access-Control-Expose-Headers'] = 'X-Next-Cursor, Server-Timing'
+    return res
+
+
+async def _fetch_all(sql, binds):
+    if database.async_pool is None: raise Exception("DB 풀 없음")
+    async with database.async_pool.acquire() as conn:
+        cur = conn.cursor()
+        await cur.execute(sql, binds)
+        return await cur.fetchall()
+
+
+# =========================================================
+# 검색 API
+# =========================================================
+
+async def _search_db_source(tag_keyword, after):
+    """DB(태그) 검색 소스 -> (items, next_after). 역색인 적재 전이면 비동기 커넥션으로 SQL 검색"""
+    search_tags = tag_search.expand_tags(tag_keyword)
+    result = tag_index.search_page(search_tags, tag_keyword, after, SEARCH_PAGE_SIZE)
+    if result is not None:
+        page, next_after = result
+        return tag_search.index_page_items(page), next_after
+    rows = await _fetch_all(*tag_search.search_sql(search_tags, tag_keyword, after, SEARCH_PAGE_SIZE))
+    return tag_search.sql_page_items(rows, SEARCH_PAGE_SIZE)
+
+
+async def _search_spotify_source(q, offset, timeout):
+    async def load():
+        # 토큰 발급(만료 시에만 HTTP)은 기존 단일 갱신 로직을 스레드에서 재사용
+        headers = await asyncio.to_thread(get_spotify_headers)
+        params = {"q": q, "type": "track", "limit": "20", "offset": offset, "market": "KR"}
+        res = await _http.get(f"{SPOTIFY_API_BASE}/search", headers=headers, params=params, timeout=httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT))
+        if res.status_code != 200: return None  # 실패 응답은 캐시하지 않음 (-> 소스 실패, partial)
+        return res.json().get('tracks', {}).get('items', []), len(res.content)
+    # 실패(200 이외) 시 None -> partial=true, 결과가 0건이면 []
+    return await search_cache.get_or_fetch_async(search_cache.make_key(q, offset, "KR"), load, wait_timeout=timeout)
+
+
+async def _timed(name, coro):
+    """(결과, 소요 ms) - 실패 시 결과 None"""
+    started = time.perf_counter()
+    try: result = await coro
+    except Exception as e:
+        print(f"❌ [Search] {name} 에러: {e}")
+        result = None
+    return result, (time.perf_counter() - started) * 1000
+
+
+@app.route('/api/search', methods=['GET'])
+async def api_search():
+    q = request.args.get('q', '')
+    offset = int(request.args.get('offset', '0'))
+    if not q: return jsonify({"error": "No query"}), 400
+    try: after = tag_search.decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except Exception: return jsonify({"error": "Invalid cursor"}), 400
+
+    # DB(태그 검색일 때)와 Spotify를 동시에 조회하고, 마감 시간까지 도착한 결과만 사용
+    tasks = {"spotify": asyncio.create_task(_timed("spotify", _search_spotify_source(q, offset, SEARCH_DEADLINE_SEC)))}
+    if q.startswith('tag:'):
+        tasks["db"] = asyncio.create_task(_timed("db", _search_db_source(q.replace('tag:', '').strip(), after)))
+    done, not_done = await asyncio.wait(tasks.values(), timeout=SEARCH_DEADLINE_SEC)
+
+    results, timings = {}, []
+    for name, task in tasks.items():
+        if task in done:
+            results[name], ms = task.result()
+            timings.append(f"{name};dur={ms:.1f}")
+        else:
+            task.cancel()  # 스레드와 달리 진행 중인 DB/HTTP 호출도 실제로 중단됨
+            timings.append(f'{name};dur={SEARCH_DEADLINE_SEC * 1000:.0f};desc="timeout"')
+    partial = bool(not_done) or any(results[name] is None for name in results)
+    db_items, next_after = results.get("db") or ([], None)
+    spotify_items = results.get("spotify") or []
+
+    res = jsonify(tag_search.search_response(tag_search.merge_results(db_items, spotify_items), offset, next_after, partial))
+    res.headers['Server-Timing'] = ", ".join(timings)
+    return res
+
+
+# =========================================================
+# 컨텍스트 추천 / 곡 태그 조회
+# =========================================================
+
+@app.route('/api/recommend/context', methods=['GET'])
+async def get_context_recommendation():
+    try:
+        context = get_context()
+        target_tags, message = context_targets(context)
+        recommended_tracks = []
+        try:
+            rows = await recommend_pool.sample_tracks_async(context_search_tags(target_tags), 4, database.async_pool)
+            recommended_tracks = context_track_items(rows)
+        except: pass
+        return jsonify(context_response(context, target_tags, message, recommended_tracks))
+    except Exception as e: return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/track/<tid>/tags', methods=['GET'])
+async def api_get_tags(tid):
+    try:
+        rows = await _fetch_all("SELECT tag_id FROM TRACK_TAGS WHERE track_id=:1", [tid])
+        return jsonify([r[0].replace('tag:', '') for r in rows])
+    except: return jsonify([])
+
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5001)
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import glob
+import queue
+import fcntl
+import atexit
+import threading
+from datetime import datetime
+import config
+from database import acquire_connection
+
+# MODIFICATION_LOGS 기록
+# - sync 모드(기본): 요청 트랜잭션 안에서 바로 INSERT (엄격한 감사용)
+# - async 모드: 저널 파일에 먼저 한 줄 쓰고 큐에 넣은 뒤 응답, 백그라운드 writer가 모아서 executemany
+#   * 크기(AUDIT_FLUSH_SIZE) 또는 시간(AUDIT_FLUSH_INTERVAL) 기준으로 flush
+#   * 큐가 가득 차면(backpressure) 그 요청은 sync 모드로 기록
+#   * 저널 세그먼트는 DB 반영이 끝나면 삭제, 프로세스가 죽어 남은 세그먼트는 다음 시작 시 재적재
+#     (세그먼트 파일에 flock을 잡아 두므로 살아 있는 다른 워커의 세그먼트는 건드리지 않음)
+#   * 재적재 직후 삭제 전에 다시 죽으면 같은 로그가 두 번 들어갈 수 있음
+#   * 저널/큐에는 요청 트랜잭션이 커밋된 뒤에 넣음 -> 롤백된 변경의 로그는 남지 않음
+#     (커밋 직후 저널 쓰기 전에 프로세스가 죽으면 그 로그는 빠질 수 있음)
+# - async 모드의 created_at은 요청 시각을 앱에서 넣음 (flush 지연만큼 밀리지 않도록)
+
+SYNC_SQL = """INSERT INTO MODIFICATION_LOGS (target_type, target_id, action_type, previous_value, new_value, user_id)
+              VALUES (:target_type, :target_id, :action_type, :previous_value, :new_value, :user_id)"""
+ASYNC_SQL = """INSERT INTO MODIFICATION_LOGS (target_type, target_id, action_type, previous_value, new_value, user_id, created_at)
+               VALUES (:target_type, :target_id, :action_type, :previous_value, :new_value, :user_id,
+                       TO_TIMESTAMP(:created_at, 'YYYY-MM-DD"T"HH24:MI:SS.FF6'))"""
+
+_queue = None
+_lock = threading.Lock()
+_segments = {}          # 세그먼트 번호 -> {"file", "path", "pending"}
+_current_seg = None
+_seg_counter = 0
+_writer = None
+_stats = {"sync": 0, "queued": 0, "flushed": 0, "fallback": 0, "replayed": 0, "error": 0, "batches": 0}
+
+
+def is_async():
+    return _writer is not None
+
+
+def make_entry(target_type, target_id, action_type, new_value=None, previous_value=None, user_id=None):
+    return {"target_type": target_type, "target_id": target_id, "action_type": action_type,
+            "previous_value": previous_value, "new_value": new_value, "user_id": user_id}
+
+
+def commit(conn, rows):
+    """변경 사항 커밋 + rows(make_entry() 형식 dict 목록) 기록. 핸들러의 conn.commit() 대신 호출
+    - sync 모드: 같은 트랜잭션에서 INSERT 후 커밋 (변경과 로그가 함께 반영/롤백)
+    - async 모드: 커밋이 성공한 뒤에만 저널/큐에 넣음 (실패/롤백된 변경은 로그에 남지 않음)
+      큐가 가득 차 있으면 커밋 전에 sync 모드로 기록"""
+    cur = conn.cursor()
+    if rows and is_async() and _has_room(len(rows)):
+        conn.commit()
+        if _enqueue(rows): return
+        # 확인 후 커밋하는 사이 큐가 찼으면 커밋된 변경에 대한 로그만 별도 트랜잭션으로
+        _stats["fallback"] += len(rows)
+        _insert_sync(cur, rows)
+        conn.commit()
+        return
+    if rows:
+        if is_async(): _stats["fallback"] += len(rows)
+        _insert_sync(cur, rows)
+    conn.commit()
+
+
+def _insert_sync(cur, rows):
+    cur.executemany(SYNC_SQL, rows)
+    _stats["sync"] += len(rows)
+
+
+def _has_room(n):
+    return _queue.maxsize - _queue.qsize() >= n
+
+
+def _enqueue(rows):
+    with _lock:
+        # 큐 소비자는 writer 하나뿐이므로 락 안에서 확인한 여유 공간은 줄어들지 않음
+        if not _has_room(len(rows)): return False
+        now = datetime.now().isoformat(timespec="microseconds")
+        rows = [{**r, "created_at": now} for r in rows]
+        seg = _journal(rows)
+        for r in rows: _queue.put_nowait((seg, r))
+        _stats["queued"] += len(rows)
+    return True
+
+
+# ---------------------------------------------------------
+# 저널 세그먼트
+# ---------------------------------------------------------
+def _open_segment():
+    """새 세그먼트 생성 (_lock 안에서 호출)"""
+    global _current_seg, _seg_counter
+    _seg_counter += 1
+    path = os.path.join(config.AUDIT_JOURNAL_DIR, f"audit-{os.getpid()}-{int(time.time() * 1000)}-{_seg_counter}.jsonl")
+    # 락을 잡은 뒤 이름을 바꿔야 다른 워커의 재적재 대상에 잠깐이라도 잡히지 않음
+    f = open(path + ".tmp", "a", encoding="utf-8")
+    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    os.rename(path + ".tmp", path)
+    _segments[_seg_counter] = {"file": f, "path": path, "pending": 0}
+    _current_seg = _seg_counter
+
+
+def _journal(rows):
+    if _current_seg is None: _open_segment()
+    seg = _segments[_current_seg]
+    seg["file"].write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+    seg["file"].flush()
+    if config.AUDIT_JOURNAL_FSYNC: os.fsync(seg["file"].fileno())
+    seg["pending"] += len(rows)
+    return _current_seg
+
+
+def _rotate():
+    """writer flush 시점마다 현재 세그먼트를 닫아 두고 다음 쓰기는 새 세그먼트로"""
+    global _current_seg
+    with _lock:
+        if _current_seg is not None and _segments[_current_seg]["pending"]: _current_seg = None
+
+
+def _release(seg_counts):
+    """DB 반영이 끝난 건수만큼 차감, 다 반영된 지난 세그먼트는 삭제"""
+    with _lock:
+        for seg_id, n in seg_counts.items():
+            seg = _segments[seg_id]
+            seg["pending"] -= n
+            if seg["pending"] == 0 and seg_id != _current_seg:
+                seg["file"].close()
+                os.remove(seg["path"])
+                del _segments[seg_id]
+
+
+# ---------------------------------------------------------
+# writer
+# ---------------------------------------------------------
+def _insert(rows):
+    with acquire_connection() as conn:
+        cur = conn.cursor()
+        cur.executemany(ASYNC_SQL, rows, batcherrors=True)
+        # 값 자체가 잘못된 행은 재시도해도 실패하므로 출력만 하고 버림
+        for e in cur.getbatcherrors():
+            _stats["error"] += 1
+            print(f"⚠️ [AuditLog] 잘못된 로그 행 제외: {rows[e.offset]} ({e.message})")
+        conn.commit()
+
+
+def _drain(block_timeout):
+    batch = []
+    try:
+        batch.append(_queue.get(timeout=block_timeout))
+        deadline = time.monotonic() + config.AUDIT_FLUSH_INTERVAL
+        while len(batch) < config.AUDIT_FLUSH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: break
+            batch.append(_queue.get(timeout=remaining))
+    except queue.Empty:
+        pass
+    return batch
+
+
+def _writer_loop():
+    while True:
+        batch = _drain(1.0)
+        if not batch: continue
+        _rotate()
+        while True:
+            try:
+                _insert([r for _, r in batch])
+                break
+            except Exception as e:
+                # DB 장애 시 저널이 남아 있으므로 잠시 후 같은 배치 재시도
+                _stats["error"] += 1
+                print(f"⚠️ [AuditLog] 로그 기록 실패, 재시도 예정: {e}")
+                time.sleep(config.AUDIT_FLUSH_INTERVAL * 5)
+        counts = {}
+        for seg, _ in batch: counts[seg] = counts.get(seg, 0) + 1
+        _release(counts)
+        _stats["flushed"] += len(batch); _stats["batches"] += 1
+
+
+def flush(timeout=5.0):
+    """큐가 빌 때까지 대기 (종료 시)"""
+    deadline = time.monotonic() + timeout
+    while is_async() and (not _queue.empty() or any(s["pending"] for s in list(_segments.values()))):
+        if time.monotonic() > deadline: return False
+        time.sleep(0.05)
+    return True
+
+
+def replay_journals():
+    """죽은 프로세스가 남긴 세그먼트를 DB에 반영 후 삭제 -> 반영 건수"""
+    total = 0
+    for path in sorted(glob.glob(os.path.join(config.AUDIT_JOURNAL_DIR, "audit-*.jsonl"))):
+        try:
+            f = open(path, "r+", encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        try:
+            try: fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError: continue  # 살아 있는 워커의 세그먼트
+            if not os.path.exists(path): continue  # 락 대기 사이 다른 워커가 처리
+            rows = []
+            for line in f:
+                try: rows.append(json.loads(line))
+                except ValueError: pass  # 쓰다 만 마지막 줄
+            for i in range(0, len(rows), config.AUDIT_FLUSH_SIZE):
+                _insert(rows[i:i + config.AUDIT_FLUSH_SIZE])
+            os.remove(path)
+            total += len(rows)
+        except Exception as e:
+            _stats["error"] += 1
+            print(f"⚠️ [AuditLog] 저널 재적재 실패 ({path}): {e}")
+        finally:
+            f.close()
+    if total:
+        _stats["replayed"] += total
+        print(f"📜 [AuditLog] 남아 있던 저널 {total}건 반영")
+    return total
+
+
+def start_audit_log(mode=None):
+    """mode='async' 이면 저널 재적재 후 writer 시작, 'sync'면 아무것도 안 함"""
+    global _queue, _writer
+    mode = mode or config.AUDIT_LOG_MODE
+    if mode != "async" or _writer is not None: return
+    os.makedirs(config.AUDIT_JOURNAL_DIR, exist_ok=True)
+    replay_journals()
+    _queue = queue.Queue(maxsize=config.AUDIT_QUEUE_MAX)
+    _writer = threading.Thread(target=_writer_loop, name="audit-log", daemon=True)
+    _writer.start()
+    atexit.register(flush)
+    print(f"📝 [AuditLog] write-behind 모드 시작 (큐 {config.AUDIT_QUEUE_MAX}, 배치 {config.AUDIT_FLUSH_SIZE})")
+
+
+def get_audit_stats():
+    return {**_stats, "mode": "async" if is_async() else "sync", "queue": _queue.qsize() if _queue else 0,
+            "segments": len(_segments)}
@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import httpx
+
+# 동기(Flask/gunicorn) vs 비동기(Quart/hypercorn) 조회 API 부하 비교
+# - 같은 요청 묶음(검색/컨텍스트 추천/곡 태그)을 동시 접속 수를 올려 가며 양쪽 서버에 보내고
+#   처리량(req/s), p50/p95 지연, 실패 수를 나란히 출력
+# - 두 서버는 같은 DB/외부 API를 바라보게 미리 띄워 둘 것 (운영 서버에는 실행하지 말 것)
+#     gunicorn -c gunicorn.conf.py app:app -b 127.0.0.1:5000
+#     hypercorn async_app:app -b 127.0.0.1:5001
+# 사용법: python bench_async.py [요청 수] [--sync URL] [--async URL] [--track 곡ID]
+
+def _arg(name, default):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+TARGETS = {"sync": _arg("--sync", "http://127.0.0.1:5000"), "async": _arg("--async", "http://127.0.0.1:5001")}
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 2000
+TRACK_ID = _arg("--track", os.getenv("BENCH_TRACK_ID", "4uLU6hMCjMI75M1A2tKUQC"))
+CONCURRENCY = [10, 50, 200, 1000]
+QUERIES = ["tag:jpop", "tag:드라이브", "tag:휴식", "tag:Retro", "tag:신나는", "city pop"]
+
+
+def build_paths(n):
+    rnd = random.Random(7)
+    paths = []
+    for _ in range(n):
+        r = rnd.random()
+        if r < 0.6: paths.append(f"/api/search?q={rnd.choice(QUERIES)}")
+        elif r < 0.8: paths.append("/api/recommend/context")
+        else: paths.append(f"/api/track/{TRACK_ID}/tags")
+    return paths
+
+
+async def run(base, paths, concurrency):
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for p in paths: queue.put_nowait(p)
+
+    async def worker(client):
+        nonlocal errors
+        while True:
+            try: path = queue.get_nowait()
+            except asyncio.QueueEmpty: return
+            t0 = time.perf_counter()
+            try:
+                res = await client.get(base + path)
+                if res.status_code != 200: errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        await client.get(base + paths[0])  # 워밍업
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pct = lambda p: latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+    return len(paths) / elapsed, pct(0.5), pct(0.95), errors
+
+
+async def main():
+    paths = build_paths(REQUESTS)
+    print(f"🚀 [Bench] 요청 {REQUESTS}개 (검색 60% / 컨텍스트 추천 20% / 곡 태그 20%)")
+    print(f"{'동시접속':>8} | {'서버':<6} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'실패':>5}")
+    print("-" * 60)
+    for concurrency in CONCURRENCY:
+        for name, base in TARGETS.items():
+            try:
+                rps, p50, p95, errors = await run(base, paths, concurrency)
+                print(f"{concurrency:>8} | {name:<6} | {rps:>8.1f} | {p50:>8.1f} | {p95:>8.1f} | {errors:>5}")
+            except Exception as e:
+                print(f"{concurrency:>8} | {name:<6} | ❌ {e}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
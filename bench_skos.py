@@ -0,0 +1,119 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from rdflib import Graph, Namespace, RDF, SKOS, Literal
+from skos_manager import SkosManager
+from skos_snapshot import snapshot_path_for
+
+# SKOS 개념 조회 마이크로 벤치마크
+# - 기존 방식: 조회마다 전체 skos:Concept / prefLabel 스캔
+# - 신규 방식: 로드 시 생성한 인덱스 조회
+# 사용법: python bench_skos.py
+
+KOMC = Namespace("https://knowledgemap.kr/komc/def/")
+SYNTHETIC_CONCEPTS = 50000
+
+
+def legacy_find_concept_uri(g, keyword):
+    """기존 _find_concept_uri 구현 (로그 출력 제외, 비교용)"""
+    target = keyword.replace("tag:", "").strip().lower() if keyword else ""
+    candidates = []
+    for s in g.subjects(RDF.type, SKOS.Concept):
+        try:
+            if str(s).split("_")[-1].lower() == target:
+                candidates.append(s)
+        except: continue
+    if not candidates:
+        for s, p, o in g.triples((None, SKOS.prefLabel, None)):
+            if str(o).lower() == target:
+                candidates.append(s)
+    if not candidates: return None
+    for uri in candidates:
+        uri_str = str(uri)
+        if "Genre_" in uri_str or "Weather_" in uri_str:
+            return uri
+    return candidates[0]
+
+
+def build_synthetic_ttl(path, n):
+    """장르 계층 + 말단 태그로 구성된 n개 개념짜리 어휘 생성"""
+    g = Graph()
+    g.bind("skos", SKOS); g.bind("komc", KOMC)
+    n_genres = n // 10
+    for i in range(n_genres):
+        uri = KOMC[f"Genre_G{i}"]
+        g.add((uri, RDF.type, SKOS.Concept))
+        g.add((uri, SKOS.prefLabel, Literal(f"Genre {i}", lang="en")))
+        if i > 0:
+            parent = KOMC[f"Genre_G{(i - 1) // 4}"]
+            g.add((uri, SKOS.broader, parent)); g.add((parent, SKOS.narrower, uri))
+    for i in range(n - n_genres):
+        uri = KOMC[f"tag_T{i}"]
+        g.add((uri, RDF.type, SKOS.Concept))
+        g.add((uri, SKOS.prefLabel, Literal(f"태그{i}", lang="ko")))
+        g.add((KOMC[f"Genre_G{i % n_genres}"], SKOS.related, uri))
+    g.serialize(destination=path, format="turtle")
+
+
+def sample_keywords(g, k=200):
+    """ID / 라벨 / 미존재 키워드를 섞은 조회 샘플"""
+    ids = [str(s).split("_")[-1] for s in g.subjects(RDF.type, SKOS.Concept)]
+    labels = [str(o) for o in g.objects(None, SKOS.prefLabel)]
+    rnd = random.Random(42)
+    pool = [f"tag:{x}" for x in rnd.choices(ids, k=k // 2)] + rnd.choices(labels, k=k // 2 - 10)
+    pool += [f"없는태그{i}" for i in range(10)]
+    rnd.shuffle(pool)
+    return pool
+
+
+def timeit(fn, keywords, min_seconds=1.0):
+    """키워드 목록을 반복 조회해 1회 조회 평균 지연(µs) 반환"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for kw in keywords: fn(kw)
+        calls += len(keywords)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds: return elapsed / calls * 1e6
+
+
+def run(name, path):
+    g = Graph()
+    t0 = time.perf_counter()
+    g.parse(path, format="turtle")
+    parse_sec = time.perf_counter() - t0
+
+    # Turtle 로드(스냅샷 생성 포함) vs 스냅샷 로드
+    snap = snapshot_path_for(path)
+    if os.path.exists(snap): os.remove(snap)
+    t0 = time.perf_counter()
+    SkosManager(path)
+    turtle_sec = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    mgr = SkosManager(path)
+    snap_sec = time.perf_counter() - t0
+    keywords = sample_keywords(g)
+
+    # 인덱스 결과가 기존 스캔 결과와 완전히 같은지 먼저 검증
+    lookup = mgr.concept_uri
+    mismatches = [kw for kw in keywords if (lambda u: str(u) if u is not None else None)(legacy_find_concept_uri(g, kw)) != lookup(kw)]
+
+    old_us = timeit(lambda kw: legacy_find_concept_uri(g, kw), keywords[:20] if len(g) > 10000 else keywords)
+    new_us = timeit(lookup, keywords)
+    print(f"\n📊 [{name}] 트리플 {len(g)}개, 결과 불일치 {len(mismatches)}건")
+    print(f"   로드: rdflib 파싱 {parse_sec:.2f}s / SkosManager(Turtle) {turtle_sec:.2f}s / SkosManager(스냅샷) {snap_sec:.2f}s")
+    print(f"   기존 스캔   : {old_us:12.2f} µs/조회")
+    print(f"   인덱스 조회 : {new_us:12.2f} µs/조회 (x{old_us / new_us:,.0f})")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "new_data.ttl")
+        shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), "new_data.ttl"), path)
+        run("new_data.ttl", path)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.ttl")
+        build_synthetic_ttl(path, SYNTHETIC_CONCEPTS)
+        run(f"synthetic {SYNTHETIC_CONCEPTS}", path)
@@ -0,0 +1,120 @@
+import os
+import sys
+import time
+import random
+from itertools import accumulate
+import oracledb
+
+# 태그 조회 쿼리 벤치마크 (LOWER(tag_id) IN vs TAGS 차원 테이블 조인)
+# - 로컬 테스트 DB에 BENCH_ 테이블을 만들어 100만 건의 곡-태그 데이터를 넣고 두 쿼리를 비교
+# - 운영 DB에는 절대 실행하지 말 것
+# 사용법: BENCH_DB_DSN=localhost:1521/FREEPDB1 python bench_tags.py [행 수] [--keep]
+
+DSN = os.getenv("BENCH_DB_DSN", "localhost:1521/FREEPDB1")
+USER = os.getenv("BENCH_DB_USER", "bench")
+PASSWORD = os.getenv("BENCH_DB_PASSWORD", "bench")
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 1_000_000
+KEEP = "--keep" in sys.argv
+N_TRACKS = max(ROWS // 10, 1000)
+N_TAGS = 20000
+REPEAT = 20
+
+OLD_SQL = """
+    SELECT DISTINCT t.track_id, t.track_title, t.views, tt.tag_id
+    FROM BENCH_TRACKS t
+    JOIN BENCH_TRACK_TAGS tt ON t.track_id = tt.track_id
+    WHERE LOWER(tt.tag_id) IN ({binds})
+"""
+NEW_SQL = """
+    SELECT DISTINCT t.track_id, t.track_title, t.views, tt.tag_id
+    FROM BENCH_TAGS g
+    JOIN BENCH_TRACK_TAGS tt ON tt.tag_num = g.tag_num
+    JOIN BENCH_TRACKS t ON t.track_id = tt.track_id
+    WHERE g.tag_key IN ({binds})
+"""
+
+
+def drop_tables(cur):
+    for name in ("BENCH_TRACK_TAGS", "BENCH_TAGS", "BENCH_TRACKS"):
+        try: cur.execute(f"DROP TABLE {name} PURGE")
+        except oracledb.DatabaseError: pass
+
+
+def setup(conn, cur):
+    print(f"🛠️ 테스트 데이터 생성: 곡 {N_TRACKS}개, 태그 {N_TAGS}개, 곡-태그 {ROWS}행")
+    drop_tables(cur)
+    cur.execute("CREATE TABLE BENCH_TRACKS (track_id VARCHAR2(64) PRIMARY KEY, track_title VARCHAR2(400), views NUMBER)")
+    cur.execute("CREATE TABLE BENCH_TAGS (tag_num NUMBER PRIMARY KEY, tag_key VARCHAR2(400) NOT NULL UNIQUE, tag_id VARCHAR2(400) NOT NULL)")
+    cur.execute("""CREATE TABLE BENCH_TRACK_TAGS (track_id VARCHAR2(64), tag_id VARCHAR2(400), tag_num NUMBER,
+                   CONSTRAINT PK_BENCH_TRACK_TAGS PRIMARY KEY (track_id, tag_id))""")
+
+    rnd = random.Random(7)
+    cur.executemany("INSERT INTO BENCH_TRACKS VALUES (:1, :2, :3)",
+                    [[f"trk{i:08d}", f"Track {i}", rnd.randint(0, 5000)] for i in range(N_TRACKS)])
+    tags = [f"tag:Tag{i}" for i in range(N_TAGS)]
+    cur.executemany("INSERT INTO BENCH_TAGS VALUES (:1, :2, :3)", [[i + 1, t.lower(), t] for i, t in enumerate(tags)])
+
+    # 절반은 인기 태그에 몰리는 분포(zipf 유사), 절반은 균등 분포
+    cum_weights = list(accumulate(1.0 / (i + 1) for i in range(N_TAGS)))
+    seen, batch = set(), []
+    while len(seen) < ROWS:
+        tid = f"trk{rnd.randrange(N_TRACKS):08d}"
+        if rnd.random() < 0.5: tag_idx = rnd.choices(range(N_TAGS), cum_weights=cum_weights, k=1)[0]
+        else: tag_idx = rnd.randrange(N_TAGS)
+        if (tid, tag_idx) in seen: continue
+        seen.add((tid, tag_idx))
+        batch.append([tid, tags[tag_idx], tag_idx + 1])
+        if len(batch) >= 50000:
+            cur.executemany("INSERT INTO BENCH_TRACK_TAGS VALUES (:1, :2, :3)", batch); conn.commit(); batch = []
+    if batch: cur.executemany("INSERT INTO BENCH_TRACK_TAGS VALUES (:1, :2, :3)", batch)
+    conn.commit()
+
+    cur.execute("CREATE INDEX IX_BENCH_TRACK_TAGS_NUM ON BENCH_TRACK_TAGS (tag_num, track_id)")
+    for name in ("BENCH_TRACKS", "BENCH_TAGS", "BENCH_TRACK_TAGS"):
+        cur.callproc("DBMS_STATS.GATHER_TABLE_STATS", [USER.upper(), name])
+
+
+def measure(cur, sql, tags):
+    binds = {f"t{i}": t.lower() for i, t in enumerate(tags)}
+    stmt = sql.format(binds=",".join(f":t{i}" for i in range(len(tags))))
+    cur.execute(stmt, binds); rows = cur.fetchall()  # 워밍업 (하드 파스 제외)
+    timings = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        cur.execute(stmt, binds); cur.fetchall()
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    plan = []
+    try:
+        cur.execute("SELECT plan_table_output FROM TABLE(DBMS_XPLAN.DISPLAY_CURSOR(NULL, NULL, 'BASIC'))")
+        plan = [r[0] for r in cur.fetchall() if "|" in r[0]]
+    except oracledb.DatabaseError:
+        pass
+    return len(rows), timings[len(timings) // 2], timings[int(len(timings) * 0.95) - 1], plan
+
+
+def main():
+    conn = oracledb.connect(user=USER, password=PASSWORD, dsn=DSN)
+    cur = conn.cursor()
+    cur.arraysize = 1000
+    try:
+        setup(conn, cur)
+        cases = [
+            ("인기 태그 1개", ["tag:Tag0"]),
+            ("희귀 태그 1개", [f"tag:Tag{N_TAGS - 1}"]),
+            ("SKOS 확장 24개", [f"tag:Tag{i * 37}" for i in range(24)]),
+        ]
+        for name, tags in cases:
+            print(f"\n📊 [{name}]")
+            for label, sql in (("기존 LOWER(tag_id) IN", OLD_SQL), ("TAGS 조인", NEW_SQL)):
+                n, p50, p95, plan = measure(cur, sql, tags)
+                print(f"   {label:<22} rows={n:<7} p50={p50:8.2f}ms p95={p95:8.2f}ms")
+                for line in plan: print(f"      {line}")
+    finally:
+        if not KEEP: drop_tables(cur)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,13 +15,14 @@ def check_tag_data(target_tag):
         cur = conn.cursor()
 
         print("\n1️⃣ TRACK_TAGS 테이블 조회 결과:")
-        # 대소문자 무시 검색 (LOWER)
+        # 대소문자 무시 검색 (작은 TAGS 테이블에서 정규화 키로 먼저 거름)
         cur.execute("""
-            SELECT tag_id, COUNT(*) 
-            FROM TRACK_TAGS 
-            WHERE LOWER(tag_id) LIKE LOWER(:tag)
-            GROUP BY tag_id
-        """, [f"%{target_tag}%"])
+            SELECT tt.tag_id, COUNT(*) 
+            FROM TAGS g
+            JOIN TRACK_TAGS tt ON tt.tag_num = g.tag_num
+            WHERE g.tag_key LIKE :tag
+            GROUP BY tt.tag_id
+        """, [f"%{target_tag.lower()}%"])
 
         tags = cur.fetchall()
         if not tags:
@@ -17,14 +17,15 @@ def check_full_query(target_tag):
         # [검증할 쿼리] app.py에 적용한 것과 동일 (ALBUMS 테이블 JOIN 제거됨)
         sql = """
             SELECT t.track_id, t.track_title, t.artist_name, t.image_url, t.preview_url
-            FROM TRACKS t 
-            JOIN TRACK_TAGS tt ON t.track_id = tt.track_id
-            WHERE LOWER(tt.tag_id) = LOWER(:tag)
+            FROM TAGS g
+            JOIN TRACK_TAGS tt ON tt.tag_num = g.tag_num
+            JOIN TRACKS t ON t.track_id = tt.track_id
+            WHERE g.tag_key = :tag
             ORDER BY t.views DESC
         """
         
         print("\n⏳ 쿼리 실행 중...")
-        cur.execute(sql, [target_tag.strip()])
+        cur.execute(sql, [target_tag.strip().lower()])
         
         rows = cur.fetchall()
         if rows:
@@ -15,7 +15,12 @@ def check_data_mismatch(target_tag):
 
         # 1. 태그 테이블에 있는 Track ID들 가져오기
         print(f"\n1️⃣ TRACK_TAGS 테이블에서 '{target_tag}'가 달린 Track ID 목록:")
-        cur.execute("SELECT track_id FROM TRACK_TAGS WHERE LOWER(tag_id) = LOWER(:tag)", [target_tag.strip()])
+        # TAGS.tag_key(소문자 정규화) 인덱스 -> TRACK_TAGS(tag_num) 조회
+        cur.execute("""
+            SELECT tt.track_id FROM TAGS g
+            JOIN TRACK_TAGS tt ON tt.tag_num = g.tag_num
+            WHERE g.tag_key = :tag
+        """, [target_tag.strip().lower()])
         tag_rows = cur.fetchall()
         
         if not tag_rows:
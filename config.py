@@ -21,13 +21,76 @@ HOLIDAY_API_URL = "http://apis.data.go.kr/B090041/openapi/service/SpcdeInfoServi
 DB_USER = os.getenv("DB_USER", "admin")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "password")
 DB_DSN = os.getenv("DB_DSN", "ordb.mirinea.org:1521/XEPDB1")
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "5"))                 # 워커(프로세스)당 최대 커넥션 수
+DB_POOL_INCREMENT = int(os.getenv("DB_POOL_INCREMENT", "1"))
+DB_POOL_GETMODE = os.getenv("DB_POOL_GETMODE", "timedwait")      # wait / nowait / forceget / timedwait
+DB_POOL_WAIT_TIMEOUT = int(os.getenv("DB_POOL_WAIT_TIMEOUT", "5000"))  # ms, timedwait 모드에서 커넥션 대기 상한
+DB_STMT_CACHE_SIZE = int(os.getenv("DB_STMT_CACHE_SIZE", "50"))  # 커넥션별 문장 캐시 (하드/소프트 파스 감소)
+DB_POOL_PING_INTERVAL = int(os.getenv("DB_POOL_PING_INTERVAL", "60"))  # 초, 이보다 오래 쉰 커넥션은 꺼낼 때 ping
+DB_SESSION_INIT_SQL = os.getenv("DB_SESSION_INIT_SQL", "")       # 새 세션마다 실행할 SQL (';' 구분, 예: ALTER SESSION SET TIME_ZONE='Asia/Seoul')
 
 # --- 4. Constants ---
+SPOTIFY_TOKEN_REFRESH_MARGIN = int(os.getenv("SPOTIFY_TOKEN_REFRESH_MARGIN", "60"))  # 만료 N초 전부터 새 토큰 발급
 PITCH_CLASS = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
+# --- 5. 외부 HTTP 호출 (http_client) ---
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))       # 호스트별 유지할 keep-alive 커넥션 수
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))          # GET 기본 재시도 횟수
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.2"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "3"))
+HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "5")) # 429 Retry-After가 이보다 길면 재시도 안 함
+
+# --- 6. 컨텍스트 추천 후보 풀 ---
+RECOMMEND_POOL_TTL = int(os.getenv("RECOMMEND_POOL_TTL", "600"))            # 초, 지나면 백그라운드 재구성
+RECOMMEND_POOL_MAX_POOLS = int(os.getenv("RECOMMEND_POOL_MAX_POOLS", "64"))
+RECOMMEND_WEIGHT_BY_VIEWS = os.getenv("RECOMMEND_WEIGHT_BY_VIEWS", "0") == "1"  # 조회수 가중 추출
+
+# --- 7. 태그 역색인 ---
+TAG_INDEX_RECONCILE_INTERVAL = int(os.getenv("TAG_INDEX_RECONCILE_INTERVAL", "300"))  # 초, DB와 전체 재동기화 주기 (0이면 시작 시 1회)
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))               # /api/search DB 결과 페이지 크기
+SEARCH_RANK_CACHE_SIZE = int(os.getenv("SEARCH_RANK_CACHE_SIZE", "256"))   # 정렬 결과를 보관할 검색어 수
+SEARCH_DEADLINE_SEC = float(os.getenv("SEARCH_DEADLINE_SEC", "2.5"))      # DB/Spotify 동시 조회 마감 시간
+SEARCH_FANOUT_WORKERS = int(os.getenv("SEARCH_FANOUT_WORKERS", "16"))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "300"))               # 초, Spotify 검색 응답 캐시 (0이면 캐시 안 함)
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 응답 본문 크기 합 기준
+
+# --- 8. Turtle 렌더링 캐시 ---
+RENDER_CACHE_TTL = int(os.getenv("RENDER_CACHE_TTL", "300"))              # 초, 다른 워커의 쓰기가 반영되는 최대 지연
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv("RENDER_CACHE_MAX_ENTRIES", "5000"))
+EXPORT_ARRAYSIZE = int(os.getenv("EXPORT_ARRAYSIZE", "5000"))   # 전체 내보내기 시 한 번에 가져올 행 수
+
+# --- 9. 수정 로그 (MODIFICATION_LOGS) ---
+AUDIT_LOG_MODE = os.getenv("AUDIT_LOG_MODE", "sync")                      # sync: 요청 트랜잭션에서 기록 / async: write-behind
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))               # 가득 차면 sync로 기록
+AUDIT_FLUSH_SIZE = int(os.getenv("AUDIT_FLUSH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))     # 초
+AUDIT_JOURNAL_DIR = os.getenv("AUDIT_JOURNAL_DIR", os.path.join(BASE_DIR, "audit_journal"))
+AUDIT_JOURNAL_FSYNC = os.getenv("AUDIT_JOURNAL_FSYNC", "0") == "1"         # 저널 쓰기마다 fsync (전원 장애까지 대비)
+
+# --- 10. 유저 권한 캐시 ---
+USER_AUTH_TTL = int(os.getenv("USER_AUTH_TTL", "60"))   # 초, 세대 파일 갱신이 안 될 때의 최대 반영 지연
+USER_AUTH_MAX_ENTRIES = int(os.getenv("USER_AUTH_MAX_ENTRIES", "10000"))
+USER_AUTH_NEGATIVE_TTL = int(os.getenv("USER_AUTH_NEGATIVE_TTL", "5"))  # 초, 없는 user_id 조회 결과 보관 시간
+AUTH_GENERATION_FILE = os.getenv("AUTH_GENERATION_FILE", os.path.join(BASE_DIR, ".auth_generation"))
+
+# --- 11. SKOS 어휘 ---
+SKOS_FILE = os.getenv("SKOS_FILE", "new_data.ttl")
+SKOS_WATCH_INTERVAL = int(os.getenv("SKOS_WATCH_INTERVAL", "0"))  # 초 단위, 0이면 파일 감시 안 함
+SKOS_SYNC_INTERVAL = int(os.getenv("SKOS_SYNC_INTERVAL", "5"))    # 초, 다른 워커의 관리자 리로드를 반영하는 최대 지연 (0이면 이 워커만 리로드)
+SKOS_GENERATION_FILE = os.getenv("SKOS_GENERATION_FILE", os.path.join(BASE_DIR, ".skos_generation"))
+
+# --- 12. asyncio 경로 (async_app.py) ---
+ASYNC_DB_POOL_MIN = int(os.getenv("ASYNC_DB_POOL_MIN", "1"))
+ASYNC_DB_POOL_MAX = int(os.getenv("ASYNC_DB_POOL_MAX", "8"))             # 이벤트 루프의 모든 동시 요청이 나눠 쓰는 커넥션 수
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "100"))
+
 # 폴더 자동 생성
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
\ No newline at end of file
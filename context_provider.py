@@ -0,0 +1,131 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from utils import fetch_current_weather, fetch_month_holidays
+from skos_manager import get_skos_manager
+
+# 추천 컨텍스트(날씨/공휴일) 캐시
+# - 날씨: 기상청 초단기실황 발표 주기(매시 45분 이후 조회 가능)에 맞춰 갱신
+# - 공휴일: 월 단위 목록을 한 번 받아두고 오늘 날짜로 조회
+# - 요청 스레드는 항상 메모리 값만 읽고, 갱신이 필요하면 백그라운드로 넘김 (stale-while-revalidate)
+
+WEATHER_PUBLISH_MINUTE = 45
+RETRY_AFTER_FAILURE = timedelta(minutes=5)
+SCHEDULER_TICK = 60
+
+_state = {
+    "weather": "Clear", "weather_at": None, "weather_due": datetime.min,
+    "holidays": {}, "holiday_month": None, "holidays_at": None, "holidays_due": datetime.min,
+}
+_refreshing = set()
+_lock = threading.Lock()
+_scheduler = None
+
+
+def _next_weather_due(now):
+    """다음 실황 발표 이후 시각 (매시 45분)"""
+    due = now.replace(minute=WEATHER_PUBLISH_MINUTE, second=0, microsecond=0)
+    return due if due > now else due + timedelta(hours=1)
+
+
+def _refresh_weather():
+    weather = fetch_current_weather()
+    now = datetime.now()
+    if weather is None:
+        _state["weather_due"] = now + RETRY_AFTER_FAILURE
+        print("⚠️ [Context] 날씨 갱신 실패 -> 이전 값 유지")
+        return
+    _state["weather"] = weather
+    _state["weather_at"] = now
+    _state["weather_due"] = _next_weather_due(now)
+
+
+def _refresh_holidays():
+    now = datetime.now()
+    holidays = fetch_month_holidays(now.year, now.month)
+    if holidays is None:
+        _state["holidays_due"] = now + RETRY_AFTER_FAILURE
+        print("⚠️ [Context] 공휴일 갱신 실패 -> 이전 값 유지")
+        return
+    _state["holidays"] = holidays
+    _state["holiday_month"] = (now.year, now.month)
+    _state["holidays_at"] = now
+    # 다음 달 1일에 다시 조회
+    first_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    _state["holidays_due"] = (first_of_month + timedelta(days=32)).replace(day=1)
+
+
+def _run(kind, fn):
+    try: fn()
+    except Exception as e: print(f"⚠️ [Context] {kind} 갱신 에러: {e}")
+    finally:
+        with _lock: _refreshing.discard(kind)
+
+
+def _refresh_if_due(background=True):
+    now = datetime.now()
+    jobs = []
+    with _lock:
+        if now >= _state["weather_due"] and "weather" not in _refreshing:
+            _refreshing.add("weather"); jobs.append(("weather", _refresh_weather))
+        # 성공 시 due = 다음 달 1일, 실패 시 due = 5분 뒤 -> 월이 바뀌는 경우도 due 하나로 처리 (실패 재시도 간격 유지)
+        if now >= _state["holidays_due"] and "holidays" not in _refreshing:
+            _refreshing.add("holidays"); jobs.append(("holidays", _refresh_holidays))
+    for kind, fn in jobs:
+        if background: threading.Thread(target=_run, args=(kind, fn), name=f"context-{kind}", daemon=True).start()
+        else: _run(kind, fn)
+
+
+def get_context():
+    """현재 날씨/공휴일 (절대 외부 API를 기다리지 않음)"""
+    _refresh_if_due()
+    now = datetime.now()
+    holiday = _state["holidays"].get(now.strftime("%Y%m%d")) if _state["holiday_month"] == (now.year, now.month) else None
+    fmt = lambda d: d.strftime("%Y-%m-%d %H:%M:%S") if d else None
+    return {
+        "weather": _state["weather"],
+        "holiday": holiday,
+        "weather_updated_at": fmt(_state["weather_at"]),
+        "holiday_updated_at": fmt(_state["holidays_at"]),
+    }
+
+
+def start_context_provider():
+    """초기 값 채우기 + 주기 점검 스레드 시작"""
+    global _scheduler
+    if _scheduler and _scheduler.is_alive(): return _scheduler
+
+    def loop():
+        while True:
+            _refresh_if_due(background=False)
+            time.sleep(SCHEDULER_TICK)
+
+    _scheduler = threading.Thread(target=loop, name="context-scheduler", daemon=True)
+    _scheduler.start()
+    return _scheduler
+
+
+# ---------------------------------------------------------
+# 컨텍스트 추천 응답 구성 (app.py / async_app.py 공용)
+# ---------------------------------------------------------
+def context_targets(context):
+    """(추천 태그 목록, 안내 문구)"""
+    weather, holiday = context["weather"], context["holiday"]
+    if holiday:
+        return [holiday, "파티", "기념일"], f"오늘은 {holiday}! 이런 분위기 어때요?"
+    skos = get_skos_manager()
+    target_tags = skos.get_weather_tags(weather) if skos else ["휴식", "기분전환"]
+    return target_tags, f"현재 날씨({weather})에 딱 맞는 무드"
+
+
+def context_search_tags(target_tags):
+    return [f"tag:{t}" for t in target_tags] if target_tags else ["tag:기분전환"]
+
+
+def context_track_items(rows):
+    return [{ "id": r[0], "name": r[1], "artists": [{"name": r[2]}], "album": { "images": [{"url": r[3] or "img/playlist-placeholder.png"}] }, "preview_url": r[4] } for r in rows]
+
+
+def context_response(context, target_tags, message, tracks):
+    return { "message": message, "weather": context["weather"], "holiday": context["holiday"], "tags": target_tags, "tracks": tracks,
+             "context_updated_at": {"weather": context["weather_updated_at"], "holiday": context["holiday_updated_at"]} }
@@ -1,5 +1,6 @@
 import oracledb
 import config
+import user_auth
 from werkzeug.security import generate_password_hash
 
 def create_admin_user():
@@ -29,6 +30,7 @@ def create_admin_user():
             print(f"✅ 새로운 관리자 '{user_id}'를 생성했습니다.")
             
         conn.commit()
+        user_auth.invalidate(user_id)  # 실행 중인 앱의 권한 캐시에 반영
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
     finally:
@@ -1,35 +1,93 @@
+import time
+import threading
 import oracledb
 from flask import g
 import config
 
 db_pool = None
+async_pool = None       # async_app.py 전용 (oracledb asyncio 풀)
+_stats = {"acquired": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "timeouts": 0, "errors": 0, "close_ignored": 0}
+_stats_lock = threading.Lock()
+
+GETMODES = {
+    "wait": oracledb.POOL_GETMODE_WAIT,
+    "nowait": oracledb.POOL_GETMODE_NOWAIT,
+    "forceget": oracledb.POOL_GETMODE_FORCEGET,
+    "timedwait": oracledb.POOL_GETMODE_TIMEDWAIT,
+}
+
+def _init_session(conn, requested_tag):
+    """풀에서 새 세션이 만들어질 때 1회 실행 (DB_SESSION_INIT_SQL, ';'로 구분)"""
+    cur = conn.cursor()
+    for stmt in filter(None, (s.strip() for s in config.DB_SESSION_INIT_SQL.split(";"))):
+        cur.execute(stmt)
+
+async def _init_session_async(conn, requested_tag):
+    cur = conn.cursor()
+    for stmt in filter(None, (s.strip() for s in config.DB_SESSION_INIT_SQL.split(";"))):
+        await cur.execute(stmt)
 
 def init_db_pool():
-    """앱 시작 시 DB 풀 생성"""
+    """앱 시작 시 DB 풀 생성 (크기/대기 방식/문장 캐시 등은 config.py 에서)"""
     global db_pool
     try:
         db_pool = oracledb.create_pool(
             user=config.DB_USER,
             password=config.DB_PASSWORD,
             dsn=config.DB_DSN,
-            min=1, max=5
+            min=config.DB_POOL_MIN, max=config.DB_POOL_MAX, increment=config.DB_POOL_INCREMENT,
+            getmode=GETMODES[config.DB_POOL_GETMODE], wait_timeout=config.DB_POOL_WAIT_TIMEOUT,
+            stmtcachesize=config.DB_STMT_CACHE_SIZE, ping_interval=config.DB_POOL_PING_INTERVAL,
+            session_callback=_init_session if config.DB_SESSION_INIT_SQL else None
         )
-        print("[DB] Oracle Pool 생성 완료.")
+        print(f"[DB] Oracle Pool 생성 완료. (min={config.DB_POOL_MIN}, max={config.DB_POOL_MAX}, getmode={config.DB_POOL_GETMODE})")
     except Exception as e:
         print(f"[DB 오류] {e}")
         db_pool = None
 
+def _acquire():
+    """풀에서 커넥션 획득 + 대기 시간/타임아웃 집계"""
+    if not db_pool: raise Exception("DB 풀 없음")
+    started = time.perf_counter()
+    try:
+        conn = db_pool.acquire()
+    except oracledb.Error as e:
+        with _stats_lock:
+            # DPY-4005: wait_timeout 초과 / DPY-4029, ORA-24418: nowait 모드에서 여유 커넥션 없음
+            if any(code in str(e) for code in ("DPY-4005", "DPY-4029", "ORA-24418", "ORA-24457")): _stats["timeouts"] += 1
+            else: _stats["errors"] += 1
+        raise
+    waited = (time.perf_counter() - started) * 1000
+    with _stats_lock:
+        _stats["acquired"] += 1
+        _stats["wait_ms_total"] += waited
+        _stats["wait_ms_max"] = max(_stats["wait_ms_max"], waited)
+    return conn
+
+class RequestConnection:
+    """요청 단위 커넥션 래퍼: close()는 무시하고 close_db(teardown)에서만 풀로 반환
+    (핸들러/서비스가 g.db를 닫아 같은 요청의 다음 조회가 실패하거나 풀이 흔들리는 것 방지)"""
+    def __init__(self, conn): self._conn = conn
+    def __getattr__(self, name): return getattr(self._conn, name)
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def close(self):
+        with _stats_lock: _stats["close_ignored"] += 1
+
 def get_db_connection():
     """요청 시 커넥션 가져오기"""
-    if not db_pool: raise Exception("DB 풀 없음")
-    if 'db' not in g: g.db = db_pool.acquire()
+    if 'db' not in g: g.db = RequestConnection(_acquire())
     return g.db
 
+def acquire_connection():
+    """요청 밖(백그라운드 스레드) 작업용 커넥션. with 블록이 끝나면 풀로 반환"""
+    return _acquire()
+
 def close_db(exception=None):
     db = g.pop("db", None)
     if db is not None:
         try:
-            db.close()
+            db._conn.close()
         # [수정] oracledb.exceptions.InterfaceError -> oracledb.InterfaceError
         except oracledb.InterfaceError as e:
             # DPY-1001: 이미 끊긴 연결 → 조용히 무시
@@ -40,4 +98,38 @@ def close_db(exception=None):
         except Exception as e:
             # teardown에서 예외 다시 던지면 응답이 500으로 덮이니까
             # 여기서는 그냥 로그만 남기고 끝낸다
-            print(f"[DB Close Error] {e}")
\ No newline at end of file
+            print(f"[DB Close Error] {e}")
+
+def init_async_pool():
+    """async_app.py 시작 시 asyncio 풀 생성 (thin 모드). 커넥션을 기다리는 동안 이벤트 루프는 다른 요청 처리"""
+    global async_pool
+    try:
+        async_pool = oracledb.create_pool_async(
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+            dsn=config.DB_DSN,
+            min=config.ASYNC_DB_POOL_MIN, max=config.ASYNC_DB_POOL_MAX, increment=config.DB_POOL_INCREMENT,
+            getmode=GETMODES[config.DB_POOL_GETMODE], wait_timeout=config.DB_POOL_WAIT_TIMEOUT,
+            stmtcachesize=config.DB_STMT_CACHE_SIZE, ping_interval=config.DB_POOL_PING_INTERVAL,
+            session_callback=_init_session_async if config.DB_SESSION_INIT_SQL else None
+        )
+        print(f"[DB] Oracle Async Pool 생성 완료. (min={config.ASYNC_DB_POOL_MIN}, max={config.ASYNC_DB_POOL_MAX})")
+    except Exception as e:
+        print(f"[DB 오류] {e}")
+        async_pool = None
+    return async_pool
+
+async def close_async_pool():
+    global async_pool
+    if async_pool is not None:
+        try: await async_pool.close(force=True)
+        except Exception as e: print(f"[DB Close Error] {e}")
+        async_pool = None
+
+def get_pool_stats():
+    with _stats_lock: stats = dict(_stats)
+    stats["wait_ms_avg"] = round(stats["wait_ms_total"] / stats["acquired"], 2) if stats["acquired"] else 0
+    stats["wait_ms_total"] = round(stats["wait_ms_total"], 1); stats["wait_ms_max"] = round(stats["wait_ms_max"], 1)
+    if db_pool is None: return {**stats, "ready": False}
+    return {**stats, "ready": True, "opened": db_pool.opened, "busy": db_pool.busy, "min": db_pool.min, "max": db_pool.max,
+            "getmode": config.DB_POOL_GETMODE, "stmtcachesize": db_pool.stmtcachesize}
@@ -0,0 +1,148 @@
+import zlib
+import base64
+from urllib.parse import quote
+import config
+from database import acquire_connection
+from skos_manager import get_skos_manager
+
+# 전체 지식 그래프 스트리밍 내보내기 (N-Triples / Turtle)
+# - 곡, 곡-태그, 영화, 영화-OST, SKOS 어휘
+# - 서버 측 커서를 arraysize 단위로 읽으면서 바로 직렬화 -> 데이터 크기와 무관하게 일정한 메모리
+# - since 지정 시 MODIFICATION_LOGS 기준으로 그 이후 태그/OST 편집이 있었던 곡/영화만 (어휘는 제외)
+#   로그를 남기지 않는 변경(일괄 가져오기, 조회수/메타데이터, 박스오피스 순위/포스터 갱신)은 포함되지 않음
+#   -> 응답 헤더 X-Export-Since-Scope 와 출력 첫 줄 주석으로 범위를 알림
+
+RES = "https://knowledgemap.kr/resource/"
+PREFIXES = {
+    "schema": "http://schema.org/",
+    "komc": "https://knowledgemap.kr/komc/def/",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+RDF_TYPE = PREFIXES["rdf"] + "type"
+CHUNK_SIZE = 64 * 1024
+SINCE_SCOPE = ("TRACK_TAG", "MOVIE_OST")  # since 증분에 반영되는 MODIFICATION_LOGS.target_type
+
+_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
+
+def _iri(value):
+    return f"<{value}>"
+
+
+def _lit(value, lang=None, datatype=None):
+    text = f'"{str(value).translate(_ESCAPES)}"'
+    if lang: return f"{text}@{lang}"
+    if datatype: return f"{text}^^<{PREFIXES['xsd']}{datatype}>"
+    return text
+
+
+def _movie_iri(movie_id):
+    return _iri(RES + "movie/" + base64.urlsafe_b64encode(str(movie_id).encode()).decode().rstrip("="))
+
+
+def _track_iri(track_id):
+    return _iri(RES + "track/" + track_id)
+
+
+def _tag_iri(tag, skos):
+    """어휘에 있는 태그는 SKOS 개념 URI, 없으면 태그 리소스 URI"""
+    uri = skos.concept_uri(tag) if skos else None
+    return _iri(uri or RES + "tag/" + quote(tag.replace("tag:", "", 1), safe=""))
+
+
+def _p(prefixed):
+    prefix, local = prefixed.split(":", 1)
+    return _iri(PREFIXES[prefix] + local)
+
+
+def _rows(conn, sql, binds=None):
+    cur = conn.cursor()
+    cur.arraysize = config.EXPORT_ARRAYSIZE
+    cur.prefetchrows = config.EXPORT_ARRAYSIZE + 1
+    cur.execute(sql, binds or {})
+    yield from cur
+
+
+def _changed(target_type, column):
+    return f"{column} IN (SELECT target_id FROM MODIFICATION_LOGS WHERE target_type = '{target_type}' AND created_at >= :since)"
+
+
+def iter_triples(since=None):
+    """(주어, 술어, 목적어) - 각 항은 N-Triples 표기로 직렬화된 문자열"""
+    skos = get_skos_manager()
+    binds = {"since": since} if since else None
+    with acquire_connection() as conn:
+        where = f"WHERE {_changed('TRACK_TAG', 'track_id')}" if since else ""
+        for tid, title, artist, album, preview, img, bpm, mkey, duration, views in _rows(conn, f"""
+                SELECT track_id, track_title, artist_name, album_id, preview_url, image_url, bpm, music_key, duration, views
+                FROM TRACKS {where}""", binds):
+            s = _track_iri(tid)
+            yield s, _iri(RDF_TYPE), _p("schema:MusicRecording")
+            if title: yield s, _p("schema:name"), _lit(title)
+            if artist: yield s, _p("schema:byArtist"), _lit(artist)
+            if album: yield s, _p("komc:albumId"), _lit(album)
+            if img: yield s, _p("schema:image"), _lit(img)
+            if preview: yield s, _p("komc:previewUrl"), _lit(preview)
+            if bpm: yield s, _p("komc:bpm"), _lit(bpm, datatype="decimal")
+            if mkey not in (None, "-1"): yield s, _p("komc:musicKey"), _lit(mkey)
+            if duration: yield s, _p("schema:duration"), _lit(duration, datatype="integer")
+            yield s, _p("komc:playCount"), _lit(views or 0, datatype="integer")
+
+        for tid, tag in _rows(conn, f"SELECT track_id, tag_id FROM TRACK_TAGS {where}", binds):
+            yield _track_iri(tid), _p("komc:relatedTag"), _tag_iri(tag, skos)
+
+        where = f"WHERE {_changed('MOVIE_OST', 'movie_id')}" if since else ""
+        for mid, title, rank, poster in _rows(conn, f"SELECT movie_id, title, rank, poster_url FROM MOVIES {where}", binds):
+            s = _movie_iri(mid)
+            yield s, _iri(RDF_TYPE), _p("schema:Movie")
+            if title: yield s, _p("schema:name"), _lit(title)
+            if rank is not None: yield s, _p("komc:rank"), _lit(rank, datatype="integer")
+            if poster: yield s, _p("schema:image"), _lit(poster)
+
+        for mid, tid in _rows(conn, f"SELECT movie_id, track_id FROM MOVIE_OSTS {where}", binds):
+            if tid: yield _track_iri(tid), _p("komc:featuredIn"), _movie_iri(mid)
+
+    if skos and not since:
+        for uri, rel, obj, lang in skos.iter_triples():
+            if rel == "type": yield _iri(uri), _iri(RDF_TYPE), _p("skos:Concept")
+            elif rel == "prefLabel": yield _iri(uri), _p("skos:prefLabel"), _lit(obj, lang=lang)
+            else: yield _iri(uri), _p("skos:" + rel), _iri(obj)
+
+
+def _compact(term):
+    """Turtle 출력용: 알려진 네임스페이스 IRI -> prefix:local"""
+    if term.startswith("<"):
+        for prefix, ns in PREFIXES.items():
+            if term.startswith("<" + ns):
+                local = term[len(ns) + 1:-1]
+                if local and local.replace("_", "").replace("-", "").isalnum(): return f"{prefix}:{local}"
+    return term
+
+
+def iter_export(fmt="nt", since=None, compress=False):
+    """직렬화된 바이트 청크 생성기 (compress=True 면 gzip 스트림)"""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buf, size = [], 0
+    if since:
+        buf.append(f"# since {since.isoformat()}: {'/'.join(SINCE_SCOPE)} 편집 로그가 있는 곡/영화만 포함 "
+                   f"(일괄 가져오기, 조회수/메타데이터, 박스오피스 순위/포스터 갱신 제외)\n")
+    if fmt == "ttl":
+        buf.append("".join(f"@prefix {p}: <{ns}> .\n" for p, ns in PREFIXES.items()) + "\n")
+
+    def flush():
+        data = "".join(buf).encode("utf-8")
+        buf.clear()
+        return gz.compress(data) if gz else data
+
+    for s, p, o in iter_triples(since):
+        if fmt == "ttl": line = f"{_compact(s)} {'a' if p == '<' + RDF_TYPE + '>' else _compact(p)} {_compact(o)} .\n"
+        else: line = f"{s} {p} {o} .\n"
+        buf.append(line); size += len(line)
+        if size >= CHUNK_SIZE:
+            chunk = flush(); size = 0
+            if chunk: yield chunk
+    chunk = flush()
+    if gz: chunk += gz.flush()
+    if chunk: yield chunk
@@ -0,0 +1,58 @@
+import os
+import gc
+import multiprocessing
+
+# 운영 서버 설정 (pre-fork 멀티 워커)
+# 실행: gunicorn -c gunicorn.conf.py app:app
+#
+# - preload_app: 마스터가 app.py를 한 번 import -> SKOS 어휘 등 읽기 전용 데이터를 워커들이 copy-on-write로 공유
+#   (DB 풀/HTTP 세션/백그라운드 스레드는 fork 후 post_fork 에서 워커마다 생성)
+# - max_requests(+jitter): 일정 요청마다 워커를 교체해 메모리 증가를 끊음, 동시에 교체되지 않도록 jitter
+# - graceful_timeout: 재시작/교체 시 처리 중 요청을 마칠 시간
+# - 관리자 SKOS 리로드는 받은 워커만 즉시 반영, 나머지(교체로 새로 뜬 워커 포함)는 세대 파일을 보고 SKOS_SYNC_INTERVAL 초 안에 반영
+#
+# 크기 산정 (Oracle 세션 수 기준)
+#   워커당 동시 요청 수   = threads
+#   워커당 필요한 커넥션  ≈ threads + 백그라운드(태그 역색인/추천 풀/로그 writer/검색 fan-out) 여유 2~3
+#   -> DB_POOL_MAX        = threads + 3
+#   전체 Oracle 세션 수   = workers × DB_POOL_MAX  (+ 배치 스크립트용 여유)
+#   이 값이 DB의 sessions/processes 한도(또는 DBA가 정한 앱 할당량)를 넘지 않게 workers/threads를 정함
+#   예) 한도 60, threads 4 -> DB_POOL_MAX 7 -> workers ≤ 60 // 7 = 8
+#   CPU 기준 기본값은 (2 × 코어 + 1), 두 값 중 작은 쪽을 사용
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+_db_pool_max = int(os.getenv("DB_POOL_MAX", str(threads + 3)))
+_db_session_limit = int(os.getenv("DB_SESSION_LIMIT", "0"))  # 0이면 DB 한도는 고려하지 않음
+_cpu_workers = multiprocessing.cpu_count() * 2 + 1
+if _db_session_limit and _db_session_limit < _db_pool_max:
+    raise SystemExit(f"DB_SESSION_LIMIT({_db_session_limit}) < DB_POOL_MAX({_db_pool_max}): 워커 1개도 띄울 수 없습니다. "
+                     f"DB_SESSION_LIMIT를 늘리거나 GUNICORN_THREADS/DB_POOL_MAX를 줄이세요.")
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(_cpu_workers, _db_session_limit // _db_pool_max) if _db_session_limit else _cpu_workers)))
+if workers < 1: raise SystemExit(f"GUNICORN_WORKERS={workers}: 1 이상이어야 합니다.")
+os.environ.setdefault("DB_POOL_MAX", str(_db_pool_max))
+
+preload_app = True
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+accesslog = "-"
+
+# app.py import 시 워커 전용 초기화를 건너뛰게 함 (post_fork에서 수행)
+os.environ["APP_DEFER_WORKER_INIT"] = "1"
+
+
+def when_ready(server):
+    # 마스터가 로드한 객체를 GC 대상에서 빼서, 워커의 GC가 공유 페이지를 건드려 복사되는 것을 줄임
+    gc.freeze()
+    server.log.info(f"workers={workers}, threads={threads}, DB_POOL_MAX={os.environ['DB_POOL_MAX']} -> 최대 Oracle 세션 {workers * int(os.environ['DB_POOL_MAX'])}")
+
+
+def post_fork(server, worker):
+    import app
+    app.init_worker()
+    server.log.info(f"worker {worker.pid} 초기화 완료")
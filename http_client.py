@@ -0,0 +1,114 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+import config
+
+# 외부 API 공용 HTTP 클라이언트
+# - 호스트별 keep-alive 세션 (TCP/TLS 핸드셰이크 재사용, 풀 크기 제한)
+# - 기본 connect/read 타임아웃
+# - 429/5xx/연결 오류 시 지터 백오프 재시도 (429는 Retry-After 우선)
+# - 호스트별 지연/오류 통계
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _get_session(host):
+    session = _sessions.get(host)
+    if session is not None: return session
+    with _sessions_lock:
+        if host not in _sessions:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.HTTP_POOL_MAXSIZE)
+            s.mount("http://", adapter); s.mount("https://", adapter)
+            _sessions[host] = s
+        return _sessions[host]
+
+
+def reset_sessions():
+    """세션/커넥션 풀 폐기 (fork 이후 부모 소켓 공유 방지용)"""
+    with _sessions_lock:
+        for s in _sessions.values():
+            try: s.close()
+            except Exception: pass
+        _sessions.clear()
+
+
+def _record(host, started, error=False, retry=False):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _metrics_lock:
+        m = _metrics.setdefault(host, {"requests": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0})
+        m["requests"] += 1
+        m["total_ms"] += elapsed_ms
+        m["max_ms"] = max(m["max_ms"], elapsed_ms)
+        if error: m["errors"] += 1
+        if retry: m["retries"] += 1
+
+
+def _backoff(attempt):
+    """full jitter: 0 ~ base * 2^attempt (상한 HTTP_BACKOFF_MAX)"""
+    return random.uniform(0, min(config.HTTP_BACKOFF_MAX, config.HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def _retry_after(res):
+    """Retry-After 헤더(초 또는 HTTP-date) -> 대기 초, 없으면 None"""
+    value = res.headers.get("Retry-After")
+    if not value: return None
+    try: return max(float(value), 0.0)
+    except ValueError: pass
+    try: return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except Exception: return None
+
+
+def request(method, url, timeout=None, retries=None, **kwargs):
+    """retries 기본값: GET은 HTTP_MAX_RETRIES, 그 외(POST 등)는 재시도 안 함"""
+    host = urlsplit(url).netloc
+    session = _get_session(host)
+    if timeout is None: timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+    if retries is None: retries = config.HTTP_MAX_RETRIES if method.upper() == "GET" else 0
+
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            res = session.request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException:
+            _record(host, started, error=True, retry=attempt < retries)
+            if attempt >= retries: raise
+            delay = _backoff(attempt)
+        else:
+            retryable = res.status_code in RETRY_STATUSES
+            delay = _retry_after(res) if res.status_code == 429 else None
+            if delay is None: delay = _backoff(attempt)
+            # Retry-After가 너무 길면 기다리지 않고 429 그대로 반환
+            will_retry = retryable and attempt < retries and delay <= config.HTTP_MAX_RETRY_AFTER
+            _record(host, started, error=retryable, retry=will_retry)
+            if not will_retry: return res
+            res.close()
+        attempt += 1
+        time.sleep(delay)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def get_http_stats():
+    with _metrics_lock:
+        return {host: {**m, "avg_ms": round(m["total_ms"] / m["requests"], 1) if m["requests"] else 0,
+                       "total_ms": round(m["total_ms"], 1), "max_ms": round(m["max_ms"], 1)}
+                for host, m in _metrics.items()}
@@ -0,0 +1,16 @@
+import oracledb
+
+# 마이그레이션 스크립트 공용 (migrate_tags.py, migrate_log_indexes.py)
+# - import 시 부작용 없음 (명령행 인자 해석은 각 스크립트의 __main__ 에서)
+
+
+def run_step(cur, name, sql, ignore):
+    print(f"   -> {name} ...")
+    try:
+        cur.execute(sql)
+        print("      ✅ 완료")
+    except oracledb.DatabaseError as e:
+        if any(code in str(e) for code in ignore):
+            print("      ⏭️ 이미 적용됨")
+        else:
+            raise
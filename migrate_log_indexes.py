@@ -0,0 +1,38 @@
+import oracledb
+import config
+from migrate_common import run_step
+
+# MODIFICATION_LOGS 조회용 복합 인덱스 (재실행 가능)
+# - 로그 API는 (created_at, log_id) 내림차순 키셋 페이지네이션 -> 필터 컬럼 + created_at + log_id 순서의 인덱스를 역방향 범위 스캔
+# - 운영 중 생성하도록 ONLINE
+# 사용법: python migrate_log_indexes.py
+
+INDEX_STEPS = [
+    ("전체 로그 (created_at, log_id)",
+     "CREATE INDEX IX_LOGS_CREATED ON MODIFICATION_LOGS (created_at, log_id) ONLINE", ("ORA-00955", "ORA-01408")),
+    ("유형별 (target_type, created_at, log_id)",
+     "CREATE INDEX IX_LOGS_TYPE_CREATED ON MODIFICATION_LOGS (target_type, created_at, log_id) ONLINE", ("ORA-00955", "ORA-01408")),
+    ("대상별 (target_type, target_id, created_at, log_id) - 곡별 로그",
+     "CREATE INDEX IX_LOGS_TARGET_CREATED ON MODIFICATION_LOGS (target_type, target_id, created_at, log_id) ONLINE", ("ORA-00955", "ORA-01408")),
+    ("유저별 (user_id, created_at, log_id)",
+     "CREATE INDEX IX_LOGS_USER_CREATED ON MODIFICATION_LOGS (user_id, created_at, log_id) ONLINE", ("ORA-00955", "ORA-01408")),
+]
+
+
+def migrate():
+    print("🔧 [Migrate] MODIFICATION_LOGS 인덱스 생성 시작")
+    conn = None
+    try:
+        conn = oracledb.connect(user=config.DB_USER, password=config.DB_PASSWORD, dsn=config.DB_DSN)
+        cur = conn.cursor()
+        for name, sql, ignore in INDEX_STEPS: run_step(cur, name, sql, ignore)
+        cur.callproc("DBMS_STATS.GATHER_TABLE_STATS", [config.DB_USER.upper(), "MODIFICATION_LOGS"])
+        print("\n✨ [완료] 로그 인덱스 준비가 끝났습니다.")
+    except oracledb.DatabaseError as e:
+        print(f"\n❌ [마이그레이션 중단] {e}\n   👉 원인 해결 후 다시 실행하세요.")
+    finally:
+        if conn: conn.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,127 @@
+import sys
+import oracledb
+import config
+from migrate_common import run_step
+
+# TAGS 차원 테이블 도입 마이그레이션 (온라인, 재실행 가능)
+# - TAGS(tag_num, tag_key, tag_id): tag_key = LOWER(tag_id) (예: 'tag:jpop'), tag_num = 숫자 ID
+# - TRACK_TAGS.tag_num -> TAGS.tag_num 참조, (tag_num, track_id) 인덱스로 태그 조회 시 범위 스캔
+# - 트리거가 새로 들어오는 TRACK_TAGS 행의 tag_num을 채우므로 앱 쓰기 경로는 그대로 동작
+# - 각 단계는 이미 적용돼 있으면 건너뛰고, 백필은 tag_num IS NULL 행만 처리 -> 중간에 실패해도 다시 실행하면 이어서 진행
+# 사용법: python migrate_tags.py [배치크기]
+
+BATCH_SIZE = 10000  # 명령행 인자로 변경 (아래 __main__)
+
+STEPS = [
+    ("TAGS 테이블 생성", """
+        CREATE TABLE TAGS (
+            tag_num NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            tag_key VARCHAR2(400) NOT NULL,
+            tag_id  VARCHAR2(400) NOT NULL,
+            CONSTRAINT UQ_TAGS_KEY UNIQUE (tag_key)
+        )""", ("ORA-00955",)),
+    ("TRACK_TAGS.tag_num 컬럼 추가", "ALTER TABLE TRACK_TAGS ADD (tag_num NUMBER)", ("ORA-01430",)),
+    ("tag_num 자동 채움 트리거", """
+        CREATE OR REPLACE TRIGGER TRG_TRACK_TAGS_TAG_NUM
+        BEFORE INSERT OR UPDATE OF tag_id ON TRACK_TAGS
+        FOR EACH ROW
+        DECLARE
+            v_key TAGS.tag_key%TYPE := LOWER(:NEW.tag_id);
+        BEGIN
+            IF :NEW.tag_num IS NULL OR UPDATING('TAG_ID') THEN
+                BEGIN
+                    SELECT tag_num INTO :NEW.tag_num FROM TAGS WHERE tag_key = v_key;
+                EXCEPTION WHEN NO_DATA_FOUND THEN
+                    BEGIN
+                        INSERT INTO TAGS (tag_key, tag_id) VALUES (v_key, :NEW.tag_id)
+                        RETURNING tag_num INTO :NEW.tag_num;
+                    EXCEPTION WHEN DUP_VAL_ON_INDEX THEN
+                        SELECT tag_num INTO :NEW.tag_num FROM TAGS WHERE tag_key = v_key;
+                    END;
+                END;
+            END IF;
+        END;""", ()),
+]
+
+INDEX_STEPS = [
+    ("TRACK_TAGS(tag_num, track_id) 인덱스", "CREATE INDEX IX_TRACK_TAGS_TAG_NUM ON TRACK_TAGS (tag_num, track_id) ONLINE", ("ORA-00955", "ORA-01408")),
+    ("FK 제약 (검증 보류)", """
+        ALTER TABLE TRACK_TAGS ADD CONSTRAINT FK_TRACK_TAGS_TAG
+        FOREIGN KEY (tag_num) REFERENCES TAGS (tag_num) ENABLE NOVALIDATE""", ("ORA-02275",)),
+]
+
+
+def backfill_tags(conn, cur):
+    """TRACK_TAGS에 있는 태그 중 TAGS에 없는 것 등록 (대소문자 변형은 하나의 키로)"""
+    cur.execute("""
+        INSERT INTO TAGS (tag_key, tag_id)
+        SELECT LOWER(tt.tag_id), MIN(tt.tag_id)
+        FROM TRACK_TAGS tt
+        WHERE NOT EXISTS (SELECT 1 FROM TAGS g WHERE g.tag_key = LOWER(tt.tag_id))
+        GROUP BY LOWER(tt.tag_id)
+    """)
+    print(f"      ✅ 신규 태그 {cur.rowcount}개 등록")
+    conn.commit()
+
+
+def backfill_track_tags(conn, cur):
+    """tag_num 이 비어 있는 행을 배치 단위로 채움 (배치마다 커밋 -> 재실행 시 남은 행부터)"""
+    cur.execute("SELECT tag_key, tag_num FROM TAGS")
+    tag_nums = dict(cur.fetchall())
+
+    read_cur = conn.cursor()
+    read_cur.arraysize = BATCH_SIZE
+    read_cur.prefetchrows = BATCH_SIZE + 1
+    read_cur.execute("SELECT ROWIDTOCHAR(ROWID), LOWER(tag_id) FROM TRACK_TAGS WHERE tag_num IS NULL")
+
+    done = 0
+    while True:
+        rows = read_cur.fetchmany(BATCH_SIZE)
+        if not rows: break
+        batch = [[tag_nums[key], rid] for rid, key in rows if key in tag_nums]
+        cur.executemany("UPDATE TRACK_TAGS SET tag_num = :1 WHERE ROWID = CHARTOROWID(:2) AND tag_num IS NULL", batch)
+        conn.commit()
+        done += len(batch)
+        print(f"      ... {done}행 처리")
+    print(f"      ✅ TRACK_TAGS 백필 {done}행 완료")
+
+
+def migrate():
+    print(f"🔧 [Migrate] TAGS 차원 테이블 마이그레이션 시작 (배치 {BATCH_SIZE})")
+    conn = None
+    try:
+        conn = oracledb.connect(user=config.DB_USER, password=config.DB_PASSWORD, dsn=config.DB_DSN)
+        cur = conn.cursor()
+
+        print("\n1️⃣ 스키마 준비")
+        for name, sql, ignore in STEPS: run_step(cur, name, sql, ignore)
+
+        print("\n2️⃣ TAGS 백필")
+        backfill_tags(conn, cur)
+
+        print("\n3️⃣ TRACK_TAGS.tag_num 백필")
+        backfill_track_tags(conn, cur)
+        # 백필 도중 트리거 없이 들어온 행이 있었을 수 있으므로 한 번 더 확인
+        backfill_tags(conn, cur)
+        backfill_track_tags(conn, cur)
+
+        print("\n4️⃣ 인덱스 / 제약")
+        for name, sql, ignore in INDEX_STEPS: run_step(cur, name, sql, ignore)
+
+        cur.execute("SELECT COUNT(*) FROM TRACK_TAGS WHERE tag_num IS NULL")
+        missing = cur.fetchone()[0]
+        if missing:
+            print(f"\n⚠️ tag_num 이 비어 있는 행 {missing}개 -> 다시 실행하세요.")
+            return
+        run_step(cur, "FK 제약 검증", "ALTER TABLE TRACK_TAGS MODIFY CONSTRAINT FK_TRACK_TAGS_TAG VALIDATE", ())
+        run_step(cur, "tag_num NOT NULL", "ALTER TABLE TRACK_TAGS MODIFY (tag_num NOT NULL)", ("ORA-01442",))
+        print("\n✨ [완료] TAGS 마이그레이션이 끝났습니다.")
+    except oracledb.DatabaseError as e:
+        print(f"\n❌ [마이그레이션 중단] {e}\n   👉 원인 해결 후 다시 실행하면 이어서 진행합니다.")
+    finally:
+        if conn: conn.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1: BATCH_SIZE = int(sys.argv[1])
+    migrate()
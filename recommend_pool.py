@@ -0,0 +1,174 @@
+import time
+import heapq
+import random
+import threading
+import config
+from database import get_db_connection, acquire_connection
+from skos_manager import get_skos_manager
+from utils import normalize_tag_key
+
+# 컨텍스트 추천용 후보 곡 풀
+# - (어휘 버전, 태그 집합)별로 TRACKS/TRACK_TAGS 조인 결과를 메모리에 보관
+# - 요청마다 ORDER BY DBMS_RANDOM.VALUE 정렬 대신 파이썬에서 무작위(선택적으로 조회수 가중) 추출
+# - 태그 추가/삭제는 해당 태그를 포함한 풀에 증분 반영 (곡 추가/제거, 전체 쿼리 재실행 없음)
+# - TTL 만료 시에만 기존 풀로 응답하면서 백그라운드 전체 재구성 (DB와 재동기화)
+#   대소문자만 다른 같은 태그가 남아 있는 곡을 삭제로 빼는 경우 등은 이때 복구됨
+
+_pools = {}
+_rebuilding = set()
+_lock = threading.Lock()
+_stats = {"hit": 0, "build": 0, "rebuild": 0, "delta": 0, "error": 0}
+_delta_seq = 0          # 증분 반영마다 증가
+_last_delta = {}        # tag_key -> 마지막으로 증분 반영된 _delta_seq (구성 도중 들어온 변경 감지용)
+
+
+def _pool_key(tags):
+    skos = get_skos_manager()
+    return (skos.version if skos else "", frozenset(normalize_tag_key(t) for t in tags))
+
+
+def _pool_query(tag_keys):
+    keys = sorted(tag_keys)
+    bind_names = [f":t{i}" for i in range(len(keys))]
+    bind_dict = {f"t{i}": k for i, k in enumerate(keys)}
+    return f"""
+        SELECT t.track_id, t.track_title, t.artist_name, t.image_url, t.preview_url, t.views, g.tag_key
+        FROM TAGS g
+        JOIN TRACK_TAGS tt ON tt.tag_num = g.tag_num
+        JOIN TRACKS t ON t.track_id = tt.track_id
+        WHERE g.tag_key IN ({','.join(bind_names)})
+    """, bind_dict
+
+
+def _new_pool(rows, seq):
+    """rows: (곡 행 6컬럼 + tag_key) -> 곡별 한 행 목록 + 곡별 매칭 태그 키"""
+    tracks, members = {}, {}
+    for r in rows:
+        tracks.setdefault(r[0], tuple(r[:6]))
+        members.setdefault(r[0], set()).add(r[6])
+    return {"tracks": list(tracks.values()), "members": members, "built_at": time.monotonic(), "stale": False, "seq": seq}
+
+
+def _load_pool(conn, tag_keys):
+    seq = _delta_seq
+    cur = conn.cursor()
+    cur.execute(*_pool_query(tag_keys))
+    return _new_pool(cur.fetchall(), seq)
+
+
+def _store(key, pool):
+    with _lock:
+        # 쿼리 도중 이 풀의 태그에 증분 변경이 있었으면 반영 여부를 알 수 없으므로 다음 요청에서 재구성
+        if any(_last_delta.get(k, 0) > pool["seq"] for k in key[1]): pool["stale"] = True
+        _pools[key] = pool
+        # 태그 조합이 계속 늘어나는 경우 대비: 오래된 풀부터 제거
+        while len(_pools) > config.RECOMMEND_POOL_MAX_POOLS:
+            oldest = min(_pools, key=lambda k: _pools[k]["built_at"])
+            del _pools[oldest]
+
+
+def _rebuild(key):
+    try:
+        with acquire_connection() as conn:
+            _store(key, _load_pool(conn, key[1]))
+        _stats["rebuild"] += 1
+    except Exception as e:
+        _stats["error"] += 1
+        print(f"⚠️ [RecommendPool] 재구성 실패 (기존 풀 유지): {e}")
+    finally:
+        with _lock: _rebuilding.discard(key)
+
+
+def _sample(rows, k):
+    if len(rows) <= k: return random.sample(rows, len(rows))
+    if not config.RECOMMEND_WEIGHT_BY_VIEWS: return random.sample(rows, k)
+    # 가중 비복원 추출 (Efraimidis-Spirakis): key = U^(1/w), 상위 k개
+    return heapq.nlargest(k, rows, key=lambda r: random.random() ** (1.0 / ((r[5] or 0) + 1)))
+
+
+def _cached_pool(key):
+    """있으면 풀 반환(만료/stale이면 백그라운드 재구성 시작), 없으면 None"""
+    pool = _pools.get(key)
+    if pool is None: return None
+    _stats["hit"] += 1
+    expired = time.monotonic() - pool["built_at"] > config.RECOMMEND_POOL_TTL
+    if pool["stale"] or expired:
+        with _lock:
+            start = key not in _rebuilding
+            _rebuilding.add(key)
+        if start: threading.Thread(target=_rebuild, args=(key,), name="recommend-pool", daemon=True).start()
+    return pool
+
+
+def sample_tracks(tags, k=4):
+    """태그 집합에 해당하는 후보 풀에서 k곡 추출 -> DB 행 튜플 목록"""
+    key = _pool_key(tags)
+    pool = _cached_pool(key)
+    if pool is None:
+        # 최초 1회만 요청 스레드에서 구성
+        pool = _load_pool(get_db_connection(), key[1])
+        _store(key, pool)
+        _stats["build"] += 1
+    return _sample(pool["tracks"], k)
+
+
+async def sample_tracks_async(tags, k, async_pool):
+    """sample_tracks의 asyncio 버전 (async_app.py) - 최초 구성만 비동기 커넥션으로, 재구성은 동일하게 백그라운드 스레드"""
+    key = _pool_key(tags)
+    pool = _cached_pool(key)
+    if pool is None:
+        seq = _delta_seq
+        async with async_pool.acquire() as conn:
+            cur = conn.cursor()
+            await cur.execute(*_pool_query(key[1]))
+            pool = _new_pool(await cur.fetchall(), seq)
+        _store(key, pool)
+        _stats["build"] += 1
+    return _sample(pool["tracks"], k)
+
+
+def _mark_delta(keys):
+    """_lock 안에서 호출"""
+    global _delta_seq
+    _delta_seq += 1
+    for k in keys: _last_delta[k] = _delta_seq
+    _stats["delta"] += 1
+
+
+def add_track_tags(track_id, tags, cur):
+    """태그 추가 커밋 후 호출: 해당 태그를 포함한 풀에 곡 추가 (풀에 없는 곡이면 곡 정보 1회 조회)"""
+    keys = {normalize_tag_key(t) for t in tags}
+    with _lock:
+        affected = [p for (version, tag_keys), p in _pools.items() if tag_keys & keys]
+        need_row = any(track_id not in p["members"] for p in affected)
+    row = None
+    if need_row:
+        cur.execute("SELECT track_id, track_title, artist_name, image_url, preview_url, views FROM TRACKS WHERE track_id=:1", [track_id])
+        row = cur.fetchone()
+    with _lock:
+        for (version, tag_keys), pool in _pools.items():
+            matched = tag_keys & keys
+            if not matched: continue
+            if track_id in pool["members"]: pool["members"][track_id] |= matched
+            elif row:
+                pool["members"][track_id] = set(matched)
+                pool["tracks"] = pool["tracks"] + [tuple(row)]  # 추출 중인 요청이 보는 목록은 그대로 (복사 후 교체)
+        _mark_delta(keys)
+
+
+def remove_track_tag(track_id, tag):
+    """태그 삭제 커밋 후 호출: 이 태그로만 풀에 들어와 있던 곡을 제거"""
+    key = normalize_tag_key(tag)
+    with _lock:
+        for (version, tag_keys), pool in _pools.items():
+            matched = pool["members"].get(track_id) if key in tag_keys else None
+            if not matched: continue
+            matched.discard(key)
+            if not matched:
+                del pool["members"][track_id]
+                pool["tracks"] = [r for r in pool["tracks"] if r[0] != track_id]
+        _mark_delta([key])
+
+
+def get_pool_stats():
+    return {**_stats, "pools": len(_pools), "tracks": sum(len(p["tracks"]) for p in list(_pools.values()))}
@@ -0,0 +1,100 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from flask import request, make_response
+import config
+
+# 렌더링 결과(Turtle 등) 캐시 + 조건부 GET
+# - 키별로 본문, 내용 해시 ETag, Last-Modified 보관
+# - 데이터를 바꾸는 쓰기 경로에서 invalidate() 호출 -> 다음 요청에서 다시 렌더링
+# - 다른 워커 프로세스의 쓰기는 RENDER_CACHE_TTL 이 지나면 반영
+# - If-None-Match / If-Modified-Since 가 맞으면 본문 없이 304
+# - 만료/무효화된 항목은 지우지 않고 stale 표시만 (LRU 상한으로 정리) -> 다시 렌더링한 내용이 같으면 Last-Modified 유지
+
+_entries = OrderedDict()   # key -> {"body", "etag", "last_modified", "expires_at"}
+_lock = threading.Lock()
+_stats = {"hit": 0, "miss": 0, "not_modified": 0, "invalidate": 0}
+_generation = 0            # invalidate() 마다 증가 (렌더링 도중 무효화 감지용)
+
+
+def _get(key):
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry["expires_at"] < time.monotonic(): return None
+        _entries.move_to_end(key)
+        return entry
+
+
+def _put(key, body, generation):
+    """렌더링 시작 이후 invalidate()가 있었으면 저장하지 않음 (오래된 내용일 수 있음)"""
+    data = body.encode("utf-8") if isinstance(body, str) else body
+    now = time.time()
+    entry = {"body": data, "etag": '"' + hashlib.sha1(data).hexdigest() + '"',
+             "last_modified": now, "expires_at": time.monotonic() + config.RENDER_CACHE_TTL}
+    with _lock:
+        if generation != _generation:
+            entry["etag"] = None
+            return entry
+        old = _entries.get(key)
+        # 내용이 같으면 Last-Modified 유지 (TTL 만료/무효화 후 다시 렌더링했지만 실제 변경이 없는 경우)
+        if old and old["etag"] == entry["etag"]: entry["last_modified"] = old["last_modified"]
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > config.RENDER_CACHE_MAX_ENTRIES: _entries.popitem(last=False)
+    return entry
+
+
+def _not_modified(entry):
+    inm = request.headers.get("If-None-Match")
+    if inm:
+        return inm.strip() == "*" or entry["etag"] in [t.strip().removeprefix("W/") for t in inm.split(",")]
+    ims = request.headers.get("If-Modified-Since")
+    if ims:
+        try: return int(entry["last_modified"]) <= parsedate_to_datetime(ims).timestamp()
+        except Exception: return False
+    return False
+
+
+def cached_response(key, render, content_type):
+    """key 캐시가 있으면 재사용, 없으면 render() -> 본문 문자열 로 생성 후 응답 (조건부 GET 처리 포함)"""
+    entry = _get(key)
+    if entry is None:
+        _stats["miss"] += 1
+        generation = _generation
+        entry = _put(key, render(), generation)
+    else:
+        _stats["hit"] += 1
+
+    headers = {"Content-Type": content_type, "Cache-Control": "no-cache",
+               "Last-Modified": formatdate(entry["last_modified"], usegmt=True)}
+    if entry["etag"]:
+        headers["ETag"] = entry["etag"]
+        if _not_modified(entry):
+            _stats["not_modified"] += 1
+            return make_response("", 304, headers)
+    return make_response(entry["body"], 200, headers)
+
+
+def invalidate(*keys):
+    """해당 키 캐시 무효화 (키 없이 호출하면 전체). 다음 요청에서 다시 렌더링"""
+    global _generation
+    with _lock:
+        for key in (keys or list(_entries)):
+            entry = _entries.get(key)
+            if entry: entry["expires_at"] = 0
+        _generation += 1
+    _stats["invalidate"] += 1
+
+
+def track_key(track_id):
+    return f"track:{track_id}"
+
+
+BOX_OFFICE_KEY = "box-office"
+
+
+def get_render_stats():
+    now = time.monotonic()
+    return {**_stats, "entries": len(_entries), "fresh": sum(1 for e in list(_entries.values()) if e["expires_at"] >= now)}
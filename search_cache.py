@@ -0,0 +1,155 @@
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+import config
+
+# Spotify /search 응답 캐시
+# - 키: (정규화 검색어, offset, market) / TTL + LRU 제거
+# - 항목 수와 대략적인 메모리(응답 바이트 수) 두 가지 상한
+# - 같은 키의 동시 요청은 한 번만 upstream 호출 (나머지는 결과를 기다림)
+#   선행 요청이 실패(None/예외/취소)하면 기다리던 요청도 같은 실패(None)로 끝남
+#   -> upstream 장애/429 때 대기자들이 각자 재시도해 호출이 몇 배로 늘어나지 않도록
+
+_entries = OrderedDict()   # key -> (만료 시각, 크기, 값)
+_inflight = {}             # key -> {"event": threading.Event, "value": 선행 요청 결과} (TTL=0이어도 동시 요청은 합침)
+_inflight_async = {}       # key -> asyncio.Future (async_app.py)
+_lock = threading.Lock()
+_bytes = 0
+_limits = {"ttl": config.SEARCH_CACHE_TTL, "max_entries": config.SEARCH_CACHE_MAX_ENTRIES, "max_bytes": config.SEARCH_CACHE_MAX_BYTES}
+_stats = {"hit": 0, "miss": 0, "coalesced": 0, "evict": 0, "error": 0}
+
+
+def make_key(q, offset, market):
+    return (" ".join(q.lower().split()), int(offset), market)
+
+
+def _evict():
+    """상한 초과분을 오래 안 쓴 순서로 제거 (_lock 안에서 호출)"""
+    global _bytes
+    while _entries and (len(_entries) > _limits["max_entries"] or _bytes > _limits["max_bytes"]):
+        _, (_, size, _) = _entries.popitem(last=False)
+        _bytes -= size
+        _stats["evict"] += 1
+
+
+def _lookup(key):
+    global _bytes
+    entry = _entries.get(key)
+    if entry is None: return None
+    if entry[0] < time.monotonic():
+        del _entries[key]; _bytes -= entry[1]
+        return None
+    _entries.move_to_end(key)
+    return entry
+
+
+def _cached(key):
+    with _lock:
+        entry = _lookup(key)
+        if entry is not None: return entry[2]
+    return None
+
+
+def get_or_fetch(key, loader, wait_timeout=None):
+    """캐시 조회, 없으면 loader() -> (값, 크기) 로 채움. loader가 None을 주면 캐시하지 않고 None
+    같은 키를 다른 스레드가 가져오는 중이면 wait_timeout 까지 기다렸다가 그 결과 사용 (실패/시간 초과면 None)"""
+    with _lock:
+        entry = _lookup(key)
+        if entry is not None:
+            _stats["hit"] += 1
+            return entry[2]
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = {"event": threading.Event(), "value": None}
+            _stats["miss"] += 1
+        else:
+            _stats["coalesced"] += 1
+
+    if not leader:
+        # 선행 요청 결과는 캐시 저장 여부(TTL)와 관계없이 그대로 받음, 실패/시간 초과면 재시도 없이 None
+        flight["event"].wait(wait_timeout)
+        return flight["value"]
+
+    try:
+        flight["value"] = _put(key, _call(loader))
+        return flight["value"]
+    finally:
+        with _lock: _inflight.pop(key, None)
+        flight["event"].set()
+
+
+async def get_or_fetch_async(key, loader, wait_timeout=None):
+    """get_or_fetch의 asyncio 버전 (async_app.py). loader는 코루틴 함수, 같은 이벤트 루프 안에서 동시 요청을 합침
+    저장소/통계/상한은 스레드 버전과 공유"""
+    value = _cached(key)
+    if value is not None:
+        _stats["hit"] += 1
+        return value
+    fut = _inflight_async.get(key)
+    if fut is not None:
+        _stats["coalesced"] += 1
+        # 선행 요청이 실패/취소(마감 초과)됐거나 시간 안에 끝나지 않으면 재시도 없이 None
+        try: return await asyncio.wait_for(asyncio.shield(fut), wait_timeout)
+        except asyncio.TimeoutError: return None
+
+    _stats["miss"] += 1
+    fut = _inflight_async[key] = asyncio.get_running_loop().create_future()
+    value = None
+    try:
+        value = _put(key, await _call_async(loader))
+        return value
+    finally:
+        _inflight_async.pop(key, None)
+        fut.set_result(value)
+
+
+def _put(key, result):
+    """loader 결과 (값, 크기) 저장 후 값 반환 (None이면 저장 안 함)"""
+    global _bytes
+    if result is None: return None
+    value, size = result
+    if _limits["ttl"] > 0:
+        with _lock:
+            old = _entries.pop(key, None)
+            if old: _bytes -= old[1]
+            _entries[key] = (time.monotonic() + _limits["ttl"], size, value)
+            _bytes += size
+            _evict()
+    return value
+
+
+async def _call_async(loader):
+    try: return await loader()
+    except Exception:
+        _stats["error"] += 1
+        raise
+
+
+def _call(loader):
+    try: return loader()
+    except Exception:
+        _stats["error"] += 1
+        raise
+
+
+def configure(ttl=None, max_entries=None, max_bytes=None):
+    """관리자 API에서 상한 조정 (줄이면 즉시 제거)"""
+    with _lock:
+        if ttl is not None: _limits["ttl"] = int(ttl)
+        if max_entries is not None: _limits["max_entries"] = int(max_entries)
+        if max_bytes is not None: _limits["max_bytes"] = int(max_bytes)
+        _evict()
+
+
+def clear():
+    global _bytes
+    with _lock:
+        _entries.clear(); _bytes = 0
+
+
+def get_cache_stats():
+    lookups = _stats["hit"] + _stats["miss"] + _stats["coalesced"]
+    return {**_stats, **_limits, "entries": len(_entries), "bytes": _bytes,
+            "hit_ratio": round((_stats["hit"] + _stats["coalesced"]) / lookups, 3) if lookups else 0}
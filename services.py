@@ -1,8 +1,11 @@
-import requests
+import http_client
+import time
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 import oracledb
 import config
 from database import get_db_connection
+import render_cache
 
 # ---------------------------------------------------------
 # 1. TMDB 포스터 검색
@@ -15,7 +18,7 @@ def get_tmdb_poster(movie_title):
     try:
         url = "https://api.themoviedb.org/3/search/movie"
         params = { "api_key": config.TMDB_API_KEY, "query": movie_title, "language": "ko-KR", "page": 1 }
-        res = requests.get(url, params=params, timeout=5)
+        res = http_client.get(url, params=params, timeout=5)
         data = res.json()
         if data.get("results"):
             path = data["results"][0].get("poster_path")
@@ -27,15 +30,37 @@ def get_tmdb_poster(movie_title):
 # ---------------------------------------------------------
 # 2. 박스오피스 업데이트
 # ---------------------------------------------------------
+POSTER_PLACEHOLDER = "img/playlist-placeholder.png"
+POSTER_FETCH_WORKERS = 10   # 일별 박스오피스 10편을 한 번에
+
+def _cached_posters(cur, daily_list):
+    """MOVIES 테이블을 포스터 캐시로 사용: movie_id 우선, 없으면 같은 제목의 포스터 (placeholder는 미스)"""
+    mids = [item['movieCd'] for item in daily_list]
+    titles = [item['movieNm'] for item in daily_list]
+    id_binds = ",".join(f":m{i}" for i in range(len(mids)))
+    title_binds = ",".join(f":t{i}" for i in range(len(titles)))
+    cur.execute(f"""
+        SELECT movie_id, title, poster_url FROM MOVIES
+        WHERE (movie_id IN ({id_binds}) OR title IN ({title_binds}))
+          AND poster_url IS NOT NULL AND poster_url <> :ph
+    """, {**{f"m{i}": m for i, m in enumerate(mids)}, **{f"t{i}": t for i, t in enumerate(titles)}, "ph": POSTER_PLACEHOLDER})
+    by_id, by_title = {}, {}
+    for mid, title, poster in cur:
+        by_id[mid] = poster; by_title[title] = poster
+    return {item['movieCd']: by_id.get(item['movieCd']) or by_title.get(item['movieNm']) for item in daily_list}
+
 def update_box_office_data():
     if not config.KOBIS_API_KEY: return "Key Error"
     
     yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
     target_dt = yesterday.strftime("%Y%m%d")
+    timings = {}
     
     try:
-        res = requests.get(config.KOBIS_BOXOFFICE_URL, params={"key": config.KOBIS_API_KEY, "targetDt": target_dt})
+        t0 = time.perf_counter()
+        res = http_client.get(config.KOBIS_BOXOFFICE_URL, params={"key": config.KOBIS_API_KEY, "targetDt": target_dt})
         daily_list = res.json().get("boxOfficeResult", {}).get("dailyBoxOfficeList", [])
+        timings["kobis_ms"] = round((time.perf_counter() - t0) * 1000, 1)
         
         if not daily_list: return "No Data"
 
@@ -43,28 +68,40 @@ def update_box_office_data():
         
         # 🚨 [삭제] 기존 데이터를 날려버리는 이 코드를 지웁니다!
         # cur.execute("DELETE FROM MOVIES") 
-        
-        count = 0
-        for item in daily_list:
-            rank = int(item['rank'])
-            title = item['movieNm']
-            mid = item['movieCd']
-            poster = get_tmdb_poster(title) or "img/playlist-placeholder.png"
-
-# [수정] MERGE 문 - Dictionary 바인딩 사용
-            cur.execute("""
-                MERGE INTO MOVIES m
-                USING DUAL ON (m.movie_id = :mid)
-                WHEN MATCHED THEN
-                    UPDATE SET rank = :rank, poster_url = :poster, title = :title
-                WHEN NOT MATCHED THEN
-                    INSERT (movie_id, title, rank, poster_url) 
-                    VALUES (:mid, :title, :rank, :poster)
-            """, {'mid': mid, 'title': title, 'rank': rank, 'poster': poster})
-            count += 1
-            
-        conn.commit(); conn.close()
-        return f"Updated {count} movies."
+
+        # 1. 이미 포스터가 있는 영화는 DB 값 재사용
+        t0 = time.perf_counter()
+        posters = _cached_posters(cur, daily_list)
+        misses = [item for item in daily_list if not posters[item['movieCd']]]
+        timings["cache_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        # 2. 없는 것만 TMDB 동시 조회
+        t0 = time.perf_counter()
+        if misses:
+            with ThreadPoolExecutor(max_workers=POSTER_FETCH_WORKERS) as ex:
+                for item, poster in zip(misses, ex.map(lambda m: get_tmdb_poster(m['movieNm']), misses)):
+                    posters[item['movieCd']] = poster
+        timings["tmdb_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        # 3. MERGE 한 번 (executemany)
+        t0 = time.perf_counter()
+        rows = [{'mid': item['movieCd'], 'title': item['movieNm'], 'rank': int(item['rank']),
+                 'poster': posters[item['movieCd']] or POSTER_PLACEHOLDER} for item in daily_list]
+        cur.executemany("""
+            MERGE INTO MOVIES m
+            USING DUAL ON (m.movie_id = :mid)
+            WHEN MATCHED THEN
+                UPDATE SET rank = :rank, poster_url = :poster, title = :title
+            WHEN NOT MATCHED THEN
+                INSERT (movie_id, title, rank, poster_url) 
+                VALUES (:mid, :title, :rank, :poster)
+        """, rows)
+        conn.commit()
+        render_cache.invalidate(render_cache.BOX_OFFICE_KEY)
+        timings["db_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        print(f"🎬 [BoxOffice] {len(rows)}편 갱신 (포스터 캐시 {len(rows) - len(misses)} / TMDB {len(misses)}) {timings}")
+        return f"Updated {len(rows)} movies. (poster cache hit {len(rows) - len(misses)}, tmdb {len(misses)}, {timings})"
     except Exception as e: return f"Error: {str(e)}"
 
 # ---------------------------------------------------------
@@ -90,7 +127,7 @@ def save_track_details(track_id, cur, headers, genre_seeds=[]):
         url = f"{config.SPOTIFY_API_BASE}/tracks/{track_id}"
         print(f"      [Service] API 요청: {url}") # 로그
         
-        r = requests.get(url, headers=headers)
+        r = http_client.get(url, headers=headers)
         if r.status_code != 200: 
             print(f"      [Service] ❌ API 실패: {r.status_code} - {r.text}")
             return None
@@ -106,7 +143,7 @@ def save_track_details(track_id, cur, headers, genre_seeds=[]):
         duration = d['duration_ms']
 
         # Audio Features (생략 가능하지만 로그 위해 둠)
-        f_res = requests.get(f"{config.SPOTIFY_API_BASE}/audio-features/{track_id}", headers=headers)
+        f_res = http_client.get(f"{config.SPOTIFY_API_BASE}/audio-features/{track_id}", headers=headers)
         feat = f_res.json() if f_res.status_code == 200 else {}
         bpm = feat.get('tempo', 0)
         key = str(feat.get('key', -1))
@@ -124,4 +161,120 @@ def save_track_details(track_id, cur, headers, genre_seeds=[]):
 
     except Exception as e:
         print(f"      [Service] ❌ 에러 발생: {e}")
-        return None
\ No newline at end of file
+        return None
+# ---------------------------------------------------------
+# 4. Spotify 트랙 일괄 저장 (여러 곡 / 플레이리스트)
+# ---------------------------------------------------------
+TRACKS_BATCH = 50           # /tracks?ids= 최대 개수
+FEATURES_BATCH = 100        # /audio-features?ids= 최대 개수
+BULK_FETCH_WORKERS = 4      # 동시에 보낼 Spotify 요청 수 (rate limit 고려해 작게)
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def fetch_playlist_track_ids(playlist_id, headers):
+    """플레이리스트의 모든 곡 ID (100개씩 페이지 조회)"""
+    ids = []
+    url = f"{config.SPOTIFY_API_BASE}/playlists/{playlist_id}/tracks"
+    params = {"limit": 100, "fields": "items(track(id,type)),next"}
+    while url:
+        r = http_client.get(url, headers=headers, params=params)
+        if r.status_code != 200:
+            print(f"❌ [Bulk] 플레이리스트 조회 실패: {r.status_code}")
+            return None
+        d = r.json()
+        for item in d.get('items', []):
+            t = item.get('track') or {}
+            if t.get('id') and t.get('type', 'track') == 'track': ids.append(t['id'])
+        url, params = d.get('next'), None  # next URL에 쿼리가 이미 포함됨
+    return ids
+
+def _fetch_many(path, key, ids, size, headers):
+    """ids를 size개씩 나눠 동시에 조회 -> ({id: 객체}, {실패한 묶음의 id: 오류})
+    한 묶음이 실패(네트워크 오류/200 이외)해도 나머지 묶음 결과는 그대로 사용"""
+    def fetch(chunk):
+        try:
+            r = http_client.get(f"{config.SPOTIFY_API_BASE}/{path}", headers=headers, params={"ids": ",".join(chunk)})
+        except Exception as e:
+            print(f"❌ [Bulk] /{path} 요청 에러 ({len(chunk)}곡): {e}")
+            return [], f"Spotify /{path} 요청 실패: {e}"
+        if r.status_code != 200:
+            print(f"❌ [Bulk] /{path} 실패: {r.status_code}")
+            return [], f"Spotify /{path} 응답 {r.status_code}"
+        return [obj for obj in r.json().get(key, []) if obj], None
+
+    found, errors = {}, {}
+    chunks = _chunks(ids, size)
+    with ThreadPoolExecutor(max_workers=BULK_FETCH_WORKERS) as ex:
+        for chunk, (objs, error) in zip(chunks, ex.map(fetch, chunks)):
+            if error:
+                for tid in chunk: errors[tid] = error
+            for obj in objs: found[obj['id']] = obj
+    return found, errors
+
+def save_tracks_bulk(track_ids, conn, headers):
+    """여러 곡을 한 번에 저장 -> (곡별 결과 {id: {"status", "name"/"error"}}, 단계별 소요 시간)
+    - 이미 제목이 있는 곡은 건너뜀 ('Unknown'은 다시 가져옴)
+    - /tracks 50개, /audio-features 100개 단위 조회
+    - 한 트랜잭션에서 executemany MERGE (조회수 유지), 행별 오류는 batcherrors로 수집"""
+    timings = {}
+    started = time.perf_counter()
+    track_ids = list(dict.fromkeys(t for t in track_ids if t))
+    results = {}
+    cur = conn.cursor()
+
+    # 1. 이미 저장된 곡 확인 (IN 절 바인드 개수 제한 때문에 나눠서)
+    for chunk in _chunks(track_ids, 500):
+        binds = ",".join(f":{i + 1}" for i in range(len(chunk)))
+        cur.execute(f"SELECT track_id, track_title FROM TRACKS WHERE track_id IN ({binds})", chunk)
+        for tid, title in cur:
+            if title and title != 'Unknown': results[tid] = {"status": "exists", "name": title}
+    todo = [t for t in track_ids if t not in results]
+    timings["lookup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    # 2. Spotify 일괄 조회
+    t0 = time.perf_counter()
+    tracks, fetch_errors = _fetch_many("tracks", "tracks", todo, TRACKS_BATCH, headers) if todo else ({}, {})
+    # 오디오 특성 조회 실패는 곡 저장을 막지 않음 (bpm/key 기본값으로 저장)
+    features, _ = _fetch_many("audio-features", "audio_features", list(tracks), FEATURES_BATCH, headers) if tracks else ({}, {})
+    timings["spotify_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+    rows = []
+    for tid in todo:
+        d = tracks.get(tid)
+        if tid in fetch_errors:
+            results[tid] = {"status": "error", "error": fetch_errors[tid]}
+            continue
+        if not d:
+            results[tid] = {"status": "failed", "error": "Spotify에서 곡을 찾을 수 없음"}
+            continue
+        feat = features.get(tid, {})
+        img = d['album']['images'][0]['url'] if d['album']['images'] else None
+        rows.append({"tid": tid, "title": d['name'], "artist": d['artists'][0]['name'], "album": d['album']['id'],
+                     "preview": d.get('preview_url'), "img": img, "bpm": feat.get('tempo', 0),
+                     "mkey": str(feat.get('key', -1)), "dur": d['duration_ms']})
+
+    # 3. DB 저장 (한 트랜잭션)
+    t0 = time.perf_counter()
+    if rows:
+        cur.executemany("""
+            MERGE INTO TRACKS t
+            USING DUAL ON (t.track_id = :tid)
+            WHEN MATCHED THEN
+                UPDATE SET track_title = :title, artist_name = :artist, album_id = :album, preview_url = :preview,
+                           image_url = :img, bpm = :bpm, music_key = :mkey, duration = :dur
+            WHEN NOT MATCHED THEN
+                INSERT (track_id, track_title, artist_name, album_id, preview_url, image_url, bpm, music_key, duration, views)
+                VALUES (:tid, :title, :artist, :album, :preview, :img, :bpm, :mkey, :dur, 0)
+        """, rows, batcherrors=True)
+        failed = {}
+        for err in cur.getbatcherrors(): failed[err.offset] = err.message
+        for i, row in enumerate(rows):
+            if i in failed: results[row["tid"]] = {"status": "failed", "error": failed[i]}
+            else: results[row["tid"]] = {"status": "saved", "name": row["title"]}
+    conn.commit()
+    if rows: render_cache.invalidate(render_cache.BOX_OFFICE_KEY, *(render_cache.track_key(r["tid"]) for r in rows))
+    timings["db_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"📥 [Bulk] 요청 {len(track_ids)}곡 -> 저장 {len(rows)}곡, 건너뜀 {len(track_ids) - len(todo)}곡 ({timings['total_ms']}ms)")
+    return {tid: results[tid] for tid in track_ids}, timings
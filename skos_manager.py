@@ -1,121 +1,302 @@
-from rdflib import Graph, Namespace, RDF, SKOS, Literal
+import os
+import time
+import threading
+from datetime import datetime
+import config
+from skos_snapshot import parse_turtle, load_snapshot, write_snapshot, SkosTables
+
+KOMC = "https://knowledgemap.kr/komc/def/"
 
 class SkosManager:
-    def __init__(self, file_path):
-        self.g = Graph()
-        try:
-            self.g.parse(file_path, format="turtle")
-            print(f"✅ [SKOS] '{file_path}' 로드 성공! (트리플 수: {len(self.g)})")
-        except Exception as e:
-            print(f"❌ [SKOS] 로드 실패: {e}")
+    def __init__(self, file_path, use_snapshot=True):
+        """스냅샷(file_path + .snap)이 최신이면 그것을 쓰고, 아니면 Turtle 파싱 후 스냅샷 갱신"""
+        self.file_path = file_path
+        self.version = ""
+        tables = load_snapshot(file_path) if use_snapshot else None
+        if tables is None:
+            try:
+                tables = parse_turtle(file_path)
+                print(f"✅ [SKOS] '{file_path}' 로드 성공! (개념 수: {len(tables.concepts)})")
+                if use_snapshot:
+                    try: write_snapshot(tables, file_path)
+                    except Exception as e: print(f"⚠️ [SKOS] 스냅샷 저장 실패 (무시): {e}")
+            except Exception as e:
+                print(f"❌ [SKOS] 로드 실패: {e}")
+                tables = SkosTables("", [], [], {}, {}, {})
 
-        self.KOMC = Namespace("https://knowledgemap.kr/komc/def/")
+        # 어휘 버전 = 원본 파일 해시 (확장 결과 캐시 키로 사용)
+        self.version = tables.version
+        self._load_tables(tables)
+        self._build_lookup_index()
+        self._build_expansion_index()
+
+    def _load_tables(self, tables):
+        self._concepts = tables.concepts
+        self._labels = tables.labels
+        self._pref_labels = {}
+        for uri, lbl, lang in tables.labels:
+            self._pref_labels.setdefault(uri, []).append((lbl, lang))
+        self._narrower = tables.narrower
+        self._broader = tables.broader
+        self._related = tables.related
     
     def _normalize(self, text):
         """대소문자 무시 및 공백 제거"""
         if not text: return ""
         return text.replace("tag:", "").strip().lower()
 
-    def _find_concept_uri(self, keyword):
-        """키워드(ID 또는 라벨)로 개념 URI 찾기 (Genre 우선 순위 적용)"""
-        target = self._normalize(keyword)
-        candidates = []
-        
-        # 1. URI의 끝부분(ID)으로 검색
-        for s in self.g.subjects(RDF.type, SKOS.Concept):
-            # URI 파싱 안전장치 추가
+    def _build_lookup_index(self):
+        """로드 시점에 (정규화 키 -> 개념 URI) 조회 테이블 생성 (검색마다 전체 그래프 스캔 방지)"""
+        # 1. URI의 끝부분(ID) -> 후보 URI 목록 (그래프 순회 순서 유지)
+        id_index = {}
+        for s in self._concepts:
             try:
-                if str(s).split("_")[-1].lower() == target:
-                    candidates.append(s)
+                id_index.setdefault(s.split("_")[-1].lower(), []).append(s)
             except: continue
-        
-        # 2. 라벨(prefLabel)로 검색 (후보가 없을 때만)
-        if not candidates:
-            for s, p, o in self.g.triples((None, SKOS.prefLabel, None)):
-                if str(o).lower() == target:
-                    candidates.append(s)
-        
-        if not candidates:
-            print(f"⚠️ [SKOS] '{keyword}'에 대한 개념을 찾을 수 없음")
-            return None
 
-        # [디버깅 로그] 어떤 후보들이 발견되었는지 출력
-        # print(f"🔍 [SKOS Debug] '{keyword}' 후보군: {[str(c).split('/')[-1] for c in candidates]}")
+        # 2. 라벨(prefLabel) -> 후보 URI 목록
+        label_index = {}
+        for s, o, lang in self._labels:
+            label_index.setdefault(o.lower(), []).append(s)
 
-        # [핵심 수정] Genre_나 Weather_가 포함된 개념(계층 구조가 있는 개념)을 우선 반환
-        for uri in candidates:
-            uri_str = str(uri)
-            if "Genre_" in uri_str or "Weather_" in uri_str:
-                print(f"✅ [SKOS] '{keyword}' -> 계층 개념 선택됨: {uri_str.split('/')[-1]}")
-                return uri
+        # 3. 후보 선택 규칙을 미리 적용: ID 후보 우선, 그중 Genre_/Weather_ 개념 우선, 없으면 첫 번째
+        concept_index = {}
+        for key in set(id_index) | set(label_index):
+            candidates = id_index.get(key) or label_index[key]
+            selected = candidates[0]
+            for uri in candidates:
+                if "Genre_" in uri or "Weather_" in uri:
+                    selected = uri
+                    break
+            concept_index[key] = selected
 
-        # 계층 개념이 없으면 첫 번째 것 반환 (예: 말단 태그)
-        selected = candidates[0]
-        print(f"ℹ️ [SKOS] '{keyword}' -> 일반 개념 선택됨: {str(selected).split('/')[-1]}")
-        return selected
+        self._concept_index = concept_index
+        print(f"✅ [SKOS] 개념 조회 인덱스 생성 완료 (키 수: {len(concept_index)})")
+
+    def _find_concept_uri(self, keyword):
+        """키워드(ID 또는 라벨)로 개념 URI 찾기 (Genre 우선 순위 적용, 인덱스 조회)"""
+        uri = self._concept_index.get(self._normalize(keyword))
+        if uri is None:
+            print(f"⚠️ [SKOS] '{keyword}'에 대한 개념을 찾을 수 없음")
+        return uri
 
     def _get_all_labels(self, uri):
         """특정 개념의 ID와 모든 라벨(한/영)을 반환"""
         labels = set()
         try:
             # ID 추가 (예: JPop)
-            labels.add(str(uri).split("_")[-1])
+            labels.add(uri.split("_")[-1])
             # 라벨 추가 (예: J-Pop, Jpop)
-            for lbl in self.g.objects(uri, SKOS.prefLabel):
-                labels.add(str(lbl))
+            for lbl, lang in self._pref_labels.get(uri, ()):
+                labels.add(lbl)
         except: pass
         return labels
 
+    def _build_expansion_index(self):
+        """상위/하위 확장 결과와 날씨 태그를 어휘 버전별로 한 번만 계산해 frozenset으로 보관"""
+        labels_cache = {}
+        def labels_of(uri):
+            if uri not in labels_cache: labels_cache[uri] = frozenset(self._get_all_labels(uri))
+            return labels_cache[uri]
+
+        def narrower_closure(root):
+            """root + narrower* 개념들의 라벨과 각 개념의 related 라벨 (순환 참조 방지)"""
+            expanded = set(labels_of(root))
+            visited = {root}
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                # [중요] 루트/현재 노드의 related 태그도 검색 범위에 포함 (Genre_Pop -> tag_Pop)
+                for rel in self._related.get(node, ()):
+                    expanded |= labels_of(rel)
+                # narrower (하위 장르)
+                for child in self._narrower.get(node, ()):
+                    if child in visited: continue
+                    visited.add(child)
+                    expanded |= labels_of(child)
+                    stack.append(child)
+            return frozenset(expanded)
+
+        def broader_of(uri):
+            """직계 broader + related 개념 ID (저장용)"""
+            tags = {parent.split("_")[-1] for parent in self._broader.get(uri, ())}
+            tags.update(rel.split("_")[-1] for rel in self._related.get(uri, ()))
+            return frozenset(tags)
+
+        narrower_by_uri, broader_by_uri = {}, {}
+        narrower_index, broader_index = {}, {}
+        for key, uri in self._concept_index.items():
+            if uri not in narrower_by_uri:
+                narrower_by_uri[uri] = narrower_closure(uri)
+                broader_by_uri[uri] = broader_of(uri)
+            closure = narrower_by_uri[uri]
+            narrower_index[key] = closure if key in closure else closure | {key}
+            broader_index[key] = broader_by_uri[uri]
+
+        # 날씨 개념 -> 연관 태그의 한국어 라벨 (Weather_ 뒤의 이름이 키)
+        weather_index = {}
+        for s in self._concepts:
+            local = s[len(KOMC):] if s.startswith(KOMC) else ""
+            if not local.startswith("Weather_"): continue
+            tags = []
+            for rel in self._related.get(s, ()):
+                for lbl, lang in self._pref_labels.get(rel, ()):
+                    if lang == 'ko': tags.append(lbl)
+            weather_index[local[len("Weather_"):]] = tuple(tags)
+
+        self._narrower_index = narrower_index
+        self._broader_index = broader_index
+        self._weather_index = weather_index
+        print(f"✅ [SKOS] 확장 인덱스 생성 완료 (버전: {self.version[:12]}, 날씨 개념: {len(weather_index)})")
+
     def get_broader_tags(self, tag):
         """상위 개념 찾기 (저장용)"""
-        uri = self._find_concept_uri(tag)
-        if not uri: return set()
-        
-        broader_tags = set()
-        for parent in self.g.objects(uri, SKOS.broader):
-            broader_tags.add(str(parent).split("_")[-1])
-        
-        for rel in self.g.objects(uri, SKOS.related):
-            broader_tags.add(str(rel).split("_")[-1])
-            
-        return broader_tags
+        return self._broader_index.get(self._normalize(tag), frozenset())
 
     def get_narrower_tags(self, tag):
         """하위 개념 및 동의어 찾기 (검색용)"""
-        root = self._find_concept_uri(tag)
-        expanded_tags = {self._normalize(tag)}
-        
-        if not root: return list(expanded_tags)
-
-        # 1. 루트 개념 라벨 추가
-        expanded_tags.update(self._get_all_labels(root))
-
-        # 2. 하위 개념 재귀 탐색
-        def traverse(node):
-            # narrower (하위 장르)
-            for child in self.g.objects(node, SKOS.narrower):
-                expanded_tags.update(self._get_all_labels(child))
-                # 하위 장르의 연관 태그 (Genre_JPop -> tag_Jpop)
-                for rel in self.g.objects(child, SKOS.related):
-                    expanded_tags.update(self._get_all_labels(rel))
-                traverse(child)
-            
-            # [중요] 루트/현재 노드의 related 태그도 검색 범위에 포함 (Genre_Pop -> tag_Pop)
-            for rel in self.g.objects(node, SKOS.related):
-                expanded_tags.update(self._get_all_labels(rel))
-
-        traverse(root)
-        
-        # 3. 결과 반환
-        result_list = list(expanded_tags)
-        print(f"🚀 [SKOS Expansion] '{tag}' -> {len(result_list)}개 확장: {result_list}")
-        return result_list
+        key = self._normalize(tag)
+        return list(self._narrower_index.get(key, (key,)))
     
     def get_weather_tags(self, weather_keyword):
-        uri = self.KOMC[f"Weather_{weather_keyword}"]
-        if (uri, RDF.type, SKOS.Concept) not in self.g: uri = self.KOMC["Weather_Default"]
-        tags = []
-        for rel in self.g.objects(uri, SKOS.related):
-            for lbl in self.g.objects(rel, SKOS.prefLabel):
-                if lbl.language == 'ko': tags.append(str(lbl))
-        return tags
\ No newline at end of file
+        tags = self._weather_index.get(weather_keyword)
+        if tags is None: tags = self._weather_index.get("Default", ())
+        return list(tags)
+
+    def concept_uri(self, tag):
+        """태그(ID 또는 라벨) -> 개념 URI, 없으면 None (내보내기용, 로그 없음)"""
+        return self._concept_index.get(self._normalize(tag))
+
+    def iter_triples(self):
+        """어휘 자체를 (주어 URI, 관계, 목적어, 언어) 로 순회 (내보내기용)
+        관계: 'type'(목적어 None) / 'prefLabel'(목적어 = 라벨) / 'narrower' / 'broader' / 'related'(목적어 = 개념 URI)"""
+        for uri in self._concepts:
+            yield uri, "type", None, None
+        for uri, label, lang in self._labels:
+            yield uri, "prefLabel", label, lang or None
+        for name, adj in (("narrower", self._narrower), ("broader", self._broader), ("related", self._related)):
+            for uri, targets in adj.items():
+                for target in targets: yield uri, name, target, None
+
+
+# ---------------------------------------------------------
+# 현재 어휘 보관 + 핫 리로드
+# - 요청 핸들러는 get_skos_manager()로 받은 객체를 요청 끝까지 사용 (진행 중 요청은 기존 버전 유지)
+# - 리로드는 백그라운드 스레드에서 새 SkosManager를 완성한 뒤 참조만 교체 (요청 스레드는 파싱 대기 없음)
+# - 확장 결과 등 파생 데이터는 SkosManager 안에 버전별로 들어있으므로 교체 시 섞이지 않음
+# - 멀티 워커: 관리자 리로드는 세대 파일(SKOS_GENERATION_FILE)을 갱신하고,
+#   각 워커의 동기화 스레드가 SKOS_SYNC_INTERVAL 마다 확인해 스스로 리로드
+#   (마스터가 preload한 옛 어휘로 fork된 교체 워커도 첫 확인에서 따라잡음)
+# ---------------------------------------------------------
+_current = None
+_file_path = None
+_reload_lock = threading.Lock()
+_status = {"loaded_at": None, "reloading": False, "last_error": None}
+_loaded = {"generation": None, "file": None}  # 현재 어휘를 로드(시도)할 때의 세대 파일 / 어휘 파일 상태
+
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except (OSError, TypeError): return None
+
+
+def init_skos_manager(file_path):
+    """앱 시작 시 동기 로드"""
+    global _current, _file_path
+    _file_path = file_path
+    _loaded["generation"] = _file_sig(config.SKOS_GENERATION_FILE); _loaded["file"] = _file_sig(file_path)
+    _current = SkosManager(file_path)
+    _status["loaded_at"] = datetime.now()
+    return _current
+
+
+def get_skos_manager():
+    return _current
+
+
+def _do_reload(file_path):
+    global _current
+    # 로드 도중 세대 파일이 또 바뀌면 다음 동기화 확인에서 다시 리로드되도록 시작 시점 상태를 기록
+    _loaded["generation"] = _file_sig(config.SKOS_GENERATION_FILE); _loaded["file"] = _file_sig(file_path)
+    try:
+        new_mgr = SkosManager(file_path)
+        if not new_mgr.version:
+            raise Exception("어휘 로드 실패 (기존 버전 유지)")
+        old_version = _current.version if _current else None
+        _current = new_mgr
+        _status["loaded_at"] = datetime.now(); _status["last_error"] = None
+        print(f"🔄 [SKOS] 어휘 교체 완료 (pid {os.getpid()}): {(old_version or '-')[:12]} -> {new_mgr.version[:12]}")
+    except Exception as e:
+        _status["last_error"] = str(e)
+        print(f"❌ [SKOS] 리로드 실패: {e}")
+    finally:
+        _status["reloading"] = False
+        _reload_lock.release()
+
+
+def reload_skos_manager(file_path=None, background=True):
+    """이 프로세스에서 새 어휘 로드 후 원자적 교체. 이미 리로드 중이면 False"""
+    if not _reload_lock.acquire(blocking=False): return False
+    _status["reloading"] = True
+    path = file_path or _file_path
+    if background:
+        threading.Thread(target=_do_reload, args=(path,), name="skos-reload", daemon=True).start()
+    else:
+        _do_reload(path)
+    return True
+
+
+def broadcast_reload():
+    """모든 워커에 리로드 요청 (세대 파일 갱신) + 이 워커는 바로 리로드 시작
+    -> 이 워커에서 리로드를 시작했으면 True, 이미 진행 중이면 False (세대 파일은 어느 쪽이든 갱신)"""
+    try:
+        tmp = f"{config.SKOS_GENERATION_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f: f.write(f"{time.time_ns()}\n")
+        os.replace(tmp, config.SKOS_GENERATION_FILE)
+    except OSError as e:
+        _status["last_error"] = f"세대 파일 갱신 실패 (다른 워커에 전파 안 됨): {e}"
+        print(f"⚠️ [SKOS] {_status['last_error']}")
+    return reload_skos_manager()
+
+
+def skos_status():
+    mgr = _current
+    return {
+        "file": _file_path,
+        "version": mgr.version if mgr else None,
+        "pid": os.getpid(),
+        "loaded_at": _status["loaded_at"].strftime("%Y-%m-%d %H:%M:%S") if _status["loaded_at"] else None,
+        "reloading": _status["reloading"],
+        "last_error": _status["last_error"],
+        "sync_interval": config.SKOS_SYNC_INTERVAL,
+    }
+
+
+def start_skos_watcher(interval, sync_interval=0):
+    """워커별 감시 스레드 (둘 다 0 이하면 비활성)
+    - interval: 어휘 파일 변경(mtime/크기)을 확인해 자동 리로드
+    - sync_interval: 세대 파일(다른 워커의 관리자 리로드)을 확인해 리로드"""
+    if (interval <= 0 and sync_interval <= 0) or not _file_path: return None
+    tick = min(i for i in (interval, sync_interval) if i > 0)
+
+    def watch():
+        last_file_check = time.monotonic()
+        while True:
+            time.sleep(tick)
+            changed = None
+            if sync_interval > 0:
+                generation = _file_sig(config.SKOS_GENERATION_FILE)
+                if generation and generation != _loaded["generation"]: changed = "다른 워커의 리로드 요청"
+            if not changed and interval > 0 and time.monotonic() - last_file_check >= interval:
+                last_file_check = time.monotonic()
+                sig = _file_sig(_file_path)
+                if sig and sig != _loaded["file"]: changed = f"어휘 파일 변경 감지: {_file_path}"
+            if changed:
+                print(f"👀 [SKOS] {changed} (pid {os.getpid()})")
+                reload_skos_manager(background=False)
+
+    t = threading.Thread(target=watch, name="skos-watcher", daemon=True)
+    t.start()
+    return t
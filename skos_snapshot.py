@@ -0,0 +1,194 @@
+import os
+import sys
+import mmap
+import struct
+import hashlib
+from array import array
+from collections import namedtuple
+
+# SKOS 어휘 스냅샷 (Turtle -> 바이너리)
+# - 워커마다 rdflib로 Turtle을 파싱하는 비용을 없애기 위한 컴파일 결과물
+# - 구성: 헤더 + 문자열 테이블(인턴) + 개념 목록 + prefLabel 배열 + narrower/broader/related 인접 배열(CSR)
+# - 원본 Turtle의 sha1/크기/mtime을 헤더에 기록해 오래된 스냅샷을 판별
+# 사용법: python skos_snapshot.py [new_data.ttl]
+
+SNAPSHOT_MAGIC = b"KMSK"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_SUFFIX = ".snap"
+
+# magic, format, byteorder(0=little, 1=big), 원본 sha1, 원본 크기, 원본 mtime_ns
+_HEADER = struct.Struct("<4sHH20sQQ")
+
+# 파싱 결과(rdflib 비의존) - SkosManager가 인덱스를 만들 때 사용
+#   concepts: skos:Concept URI 목록, labels: (URI, 라벨, 언어) 목록
+#   narrower/broader/related: URI -> 대상 URI 목록
+SkosTables = namedtuple("SkosTables", ["version", "concepts", "labels", "narrower", "broader", "related"])
+
+_RELATIONS = ("narrower", "broader", "related")
+
+
+def snapshot_path_for(ttl_path):
+    return ttl_path + SNAPSHOT_SUFFIX
+
+
+def _file_sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def _refresh_header(snap_path, sha1, st):
+    """내용은 같은데 크기/mtime만 달라진 경우(touch, 복사 등) 헤더만 갱신 -> 다음 로드부터 해시 계산 생략
+    sha1은 그대로이므로 동시에 읽는 프로세스가 이전/새 헤더 어느 쪽을 봐도 결과는 같음 (실패해도 무시)"""
+    try:
+        with open(snap_path, "r+b") as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, 0, sha1, st.st_size, st.st_mtime_ns))
+    except OSError as e:
+        print(f"⚠️ [SKOS] 스냅샷 헤더 갱신 실패 (무시): {e}")
+
+
+# ---------------------------------------------------------
+# 1. Turtle 파싱 (rdflib은 여기서만 import)
+# ---------------------------------------------------------
+def parse_turtle(ttl_path):
+    from rdflib import Graph, RDF, SKOS
+
+    with open(ttl_path, "rb") as f:
+        data = f.read()
+    g = Graph()
+    g.parse(data=data, format="turtle")
+
+    concepts = [str(s) for s in g.subjects(RDF.type, SKOS.Concept)]
+    labels = [(str(s), str(o), getattr(o, "language", None) or "") for s, p, o in g.triples((None, SKOS.prefLabel, None))]
+    relations = {}
+    for name in _RELATIONS:
+        # 대상 순서는 g.objects() 순회 순서를 그대로 유지
+        relations[name] = {str(s): [str(o) for o in g.objects(s, SKOS[name])] for s in set(g.subjects(SKOS[name], None))}
+    print(f"✅ [SKOS] '{ttl_path}' Turtle 파싱 완료 (트리플 수: {len(g)})")
+    return SkosTables(hashlib.sha1(data).hexdigest(), concepts, labels, relations["narrower"], relations["broader"], relations["related"])
+
+
+# ---------------------------------------------------------
+# 2. 스냅샷 쓰기
+# ---------------------------------------------------------
+def write_snapshot(tables, ttl_path, snap_path=None):
+    """파싱 결과를 스냅샷 파일로 저장 (임시 파일 -> rename 으로 원자적 교체)"""
+    snap_path = snap_path or snapshot_path_for(ttl_path)
+    st = os.stat(ttl_path)
+
+    strings, ids = [], {}
+    def intern(text):
+        if text not in ids:
+            ids[text] = len(strings); strings.append(text)
+        return ids[text]
+
+    concepts = array("I", (intern(c) for c in tables.concepts))
+    labels = array("I")
+    for s, lbl, lang in tables.labels: labels.extend((intern(s), intern(lbl), intern(lang)))
+
+    adjacency = []
+    for name in _RELATIONS:
+        adj = getattr(tables, name)
+        sources, offsets, targets = array("I"), array("I", [0]), array("I")
+        for s, objs in adj.items():
+            sources.append(intern(s))
+            targets.extend(intern(o) for o in objs)
+            offsets.append(len(targets))
+        adjacency.append((sources, offsets, targets))
+
+    blobs = [s.encode("utf-8") for s in strings]
+    str_offsets = array("I", [0])
+    for b in blobs: str_offsets.append(str_offsets[-1] + len(b))
+
+    def u32_section(arr):
+        if sys.byteorder != "little": arr = array("I", arr); arr.byteswap()
+        return struct.pack("<I", len(arr)) + arr.tobytes()
+
+    body = [u32_section(str_offsets), b"".join(blobs)]
+    pad = (-sum(len(b) for b in body)) % 4
+    body.append(b"\0" * pad)
+    body.append(u32_section(concepts))
+    body.append(u32_section(labels))
+    for sources, offsets, targets in adjacency:
+        body.extend((u32_section(sources), u32_section(offsets), u32_section(targets)))
+
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, 0, bytes.fromhex(tables.version), st.st_size, st.st_mtime_ns)
+    tmp_path = f"{snap_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for part in body: f.write(part)
+    os.replace(tmp_path, snap_path)
+    print(f"💾 [SKOS] 스냅샷 저장 완료: {snap_path} (문자열 {len(strings)}개, 개념 {len(concepts)}개)")
+    return snap_path
+
+
+def compile_snapshot(ttl_path, snap_path=None):
+    return write_snapshot(parse_turtle(ttl_path), ttl_path, snap_path)
+
+
+# ---------------------------------------------------------
+# 3. 스냅샷 읽기 (rdflib 불필요)
+# ---------------------------------------------------------
+def load_snapshot(ttl_path, snap_path=None):
+    """스냅샷이 최신이면 SkosTables 반환, 없거나 오래됐으면 None"""
+    snap_path = snap_path or snapshot_path_for(ttl_path)
+    if not os.path.exists(snap_path): return None
+    refresh = None
+    try:
+        with open(snap_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, fmt, byteorder, sha1, size, mtime_ns = _HEADER.unpack_from(mm, 0)
+            if magic != SNAPSHOT_MAGIC or fmt != SNAPSHOT_FORMAT or byteorder != 0:
+                print(f"⚠️ [SKOS] 스냅샷 형식 불일치 -> 무시: {snap_path}")
+                return None
+
+            # 원본 크기/mtime이 그대로면 해시 계산 생략, 달라졌으면 내용 해시로 최종 판단
+            if os.path.exists(ttl_path):
+                st = os.stat(ttl_path)
+                if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                    if _file_sha1(ttl_path) != sha1:
+                        print(f"⚠️ [SKOS] 스냅샷이 원본보다 오래됨 -> 무시: {snap_path}")
+                        return None
+                    refresh = st
+
+            view = memoryview(mm)
+            pos = _HEADER.size
+            def u32_section():
+                nonlocal pos
+                (count,) = struct.unpack_from("<I", mm, pos)
+                arr = view[pos + 4:pos + 4 + count * 4].cast("I")
+                if sys.byteorder != "little": arr = array("I", arr); arr.byteswap()
+                pos += 4 + count * 4
+                return arr
+
+            try:
+                str_offsets = u32_section()
+                blob_start = pos
+                blob = view[blob_start:blob_start + str_offsets[-1]]
+                strings = [sys.intern(str(blob[str_offsets[i]:str_offsets[i + 1]], "utf-8")) for i in range(len(str_offsets) - 1)]
+                pos = blob_start + str_offsets[-1]
+                pos += (-(pos - _HEADER.size)) % 4
+
+                concepts = [strings[i] for i in u32_section()]
+                raw = u32_section()
+                labels = [(strings[raw[i]], strings[raw[i + 1]], strings[raw[i + 2]]) for i in range(0, len(raw), 3)]
+                relations = []
+                for _ in _RELATIONS:
+                    sources, offsets, targets = u32_section(), u32_section(), u32_section()
+                    relations.append({strings[s]: [strings[t] for t in targets[offsets[i]:offsets[i + 1]]] for i, s in enumerate(sources)})
+                    del sources, offsets, targets
+                del str_offsets, raw
+            finally:
+                # mmap을 닫기 전에 memoryview 참조를 모두 해제해야 함
+                blob = None
+                view.release()
+
+        if refresh is not None: _refresh_header(snap_path, sha1, refresh)
+        print(f"⚡ [SKOS] 스냅샷 로드 완료: {snap_path} (개념 {len(concepts)}개)")
+        return SkosTables(sha1.hex(), concepts, labels, *relations)
+    except Exception as e:
+        print(f"⚠️ [SKOS] 스냅샷 로드 실패 -> Turtle 사용: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "new_data.ttl")
+    compile_snapshot(src, sys.argv[2] if len(sys.argv) > 2 else None)
@@ -0,0 +1,180 @@
+import time
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+import config
+from database import acquire_connection
+from utils import normalize_tag_key
+
+# 메모리 상주 태그 역색인 (tag: 검색을 DB 왕복 없이 처리)
+# - postings: 정규화 태그 키 -> 곡 ID 집합
+# - tracks:   곡 ID -> (제목, 아티스트, 이미지, 미리듣기, 조회수)
+# - 앱 시작 시 백그라운드로 적재, 태그 추가/삭제 API에서 즉시 반영
+# - 다른 프로세스(apply_skos.py, 다른 워커)의 쓰기는 주기적 재적재(reconcile)로 맞춤
+
+_index = None           # {"postings", "tracks", "loaded_at", "generation"}
+_lock = threading.Lock()
+_pending = None         # 재적재 중 들어온 쓰기 (새 인덱스에 다시 적용)
+_generation = 0
+_stats = {"search": 0, "rank_hit": 0, "reload": 0, "error": 0}
+_ranked_cache = OrderedDict()  # (확장 태그 키 집합, 원래 태그 키) -> (세대, 정렬 키, 정렬 결과)
+
+
+def is_ready():
+    return _index is not None
+
+
+def _load(conn):
+    cur = conn.cursor()
+    cur.arraysize = 5000
+    cur.prefetchrows = 5001
+    cur.execute("""
+        SELECT g.tag_key, tt.track_id
+        FROM TRACK_TAGS tt
+        JOIN TAGS g ON g.tag_num = tt.tag_num
+    """)
+    postings = {}
+    for key, tid in cur:
+        postings.setdefault(key, set()).add(tid)
+
+    cur.execute("""
+        SELECT t.track_id, t.track_title, t.artist_name, t.image_url, t.preview_url, t.views
+        FROM TRACKS t
+        WHERE EXISTS (SELECT 1 FROM TRACK_TAGS tt WHERE tt.track_id = t.track_id)
+    """)
+    tracks = {r[0]: r[1:] for r in cur}
+    return postings, tracks
+
+
+def reload_index():
+    """DB 전체 재적재 후 교체 (재적재 도중 반영된 쓰기는 새 인덱스에 다시 적용)"""
+    global _index, _pending, _generation
+    with _lock: _pending = []
+    try:
+        started = time.perf_counter()
+        with acquire_connection() as conn:
+            postings, tracks = _load(conn)
+        with _lock:
+            new_index = {"postings": postings, "tracks": tracks, "loaded_at": time.time(), "generation": _generation + 1}
+            for op in _pending: op(new_index)
+            _index = new_index
+            _generation += 1
+        _stats["reload"] += 1
+        print(f"🗂️ [TagIndex] 적재 완료: 태그 {len(postings)}개, 곡 {len(tracks)}개 ({time.perf_counter() - started:.2f}s)")
+    except Exception as e:
+        _stats["error"] += 1
+        print(f"⚠️ [TagIndex] 적재 실패 (기존 인덱스 유지): {e}")
+    finally:
+        with _lock: _pending = None
+
+
+def _apply(op):
+    """현재 인덱스에 쓰기 반영 + 재적재 중이면 기록"""
+    global _generation
+    with _lock:
+        if _index is not None:
+            op(_index)
+            _generation += 1
+            _index["generation"] = _generation
+        if _pending is not None: _pending.append(op)
+
+
+def add_track_tags(track_id, tags, cur):
+    """태그 추가 커밋 후 호출. 인덱스에 없는 곡이면 메타데이터를 한 번 조회"""
+    if _index is None: return
+    meta = _index["tracks"].get(track_id)
+    if meta is None:
+        cur.execute("SELECT track_title, artist_name, image_url, preview_url, views FROM TRACKS WHERE track_id=:1", [track_id])
+        meta = cur.fetchone()
+        if not meta: return
+    keys = [normalize_tag_key(t) for t in tags]
+
+    def op(index):
+        index["tracks"][track_id] = tuple(meta)
+        for key in keys: index["postings"].setdefault(key, set()).add(track_id)
+    _apply(op)
+
+
+def remove_track_tag(track_id, tag):
+    """태그 삭제 커밋 후 호출 (대소문자만 다른 태그가 남아 있는 경우는 재적재 시 복구됨)"""
+    key = normalize_tag_key(tag)
+
+    def op(index):
+        ids = index["postings"].get(key)
+        if ids:
+            ids.discard(track_id)
+            if not ids: del index["postings"][key]
+    _apply(op)
+
+
+def _ranked(index, search_tags, original_tag):
+    """SKOS 확장 태그들의 합집합을 점수순으로 정렬한 목록 (인덱스 세대별 캐시)
+    점수: 조회수 + (원래 태그와 정확히 일치 10000 / 확장 태그 일치 5000)
+    반환: (정렬 키 [(−점수, 곡 ID)], [(점수, 곡 ID, 메타)])"""
+    exact_key = normalize_tag_key(original_tag)
+    tag_keys = frozenset(normalize_tag_key(t) for t in search_tags)
+    cache_key = (tag_keys, exact_key)
+    with _lock:
+        # 증분 쓰기(_apply)는 같은 인덱스 객체의 세대를 올리므로 시작 시점 세대를 한 번만 읽어 확인/저장에 같이 사용
+        generation = index["generation"]
+        cached = _ranked_cache.get(cache_key)
+        if cached and cached[0] == generation:
+            _ranked_cache.move_to_end(cache_key)
+            _stats["rank_hit"] += 1
+            return cached[1], cached[2]
+
+    postings, tracks = index["postings"], index["tracks"]
+    exact = postings.get(exact_key, set())
+    matched = set()
+    for key in tag_keys:
+        matched |= postings.get(key, set())
+
+    ranked = []
+    for tid in matched:
+        meta = tracks.get(tid)
+        if meta is None: continue
+        score = (meta[4] or 0) + (10000 if tid in exact else 5000)
+        ranked.append((score, tid, meta))
+    ranked.sort(key=lambda x: (-x[0], x[1]))
+    sort_keys = [(-score, tid) for score, tid, meta in ranked]
+
+    with _lock:
+        # 계산 도중 쓰기가 반영됐으면 이 결과는 이번 요청에만 쓰고 캐시하지 않음
+        if index["generation"] == generation:
+            _ranked_cache[cache_key] = (generation, sort_keys, ranked)
+            _ranked_cache.move_to_end(cache_key)
+            while len(_ranked_cache) > config.SEARCH_RANK_CACHE_SIZE: _ranked_cache.popitem(last=False)
+    return sort_keys, ranked
+
+
+def search_page(search_tags, original_tag, after=None, limit=20):
+    """키셋 페이지네이션: after=(점수, 곡 ID) 다음부터 limit개 -> ([(점수, 곡 ID, 메타)], 다음 커서 또는 None)
+    정렬 결과는 캐시되므로 깊은 페이지도 이진 탐색 + 슬라이스 비용만 듦"""
+    index = _index
+    if index is None: return None
+    _stats["search"] += 1
+    sort_keys, ranked = _ranked(index, search_tags, original_tag)
+    start = bisect_right(sort_keys, (-after[0], after[1])) if after else 0
+    page = ranked[start:start + limit]
+    next_after = (page[-1][0], page[-1][1]) if page and start + limit < len(ranked) else None
+    return page, next_after
+
+
+def get_index_stats():
+    index = _index
+    if index is None: return {**_stats, "ready": False}
+    return {**_stats, "ready": True, "tags": len(index["postings"]), "tracks": len(index["tracks"]),
+            "generation": index["generation"], "age_sec": int(time.time() - index["loaded_at"])}
+
+
+def start_tag_index(interval):
+    """최초 적재 + interval 초마다 재적재 (interval <= 0 이면 최초 적재만)"""
+    def loop():
+        while True:
+            reload_index()
+            if interval <= 0: return
+            time.sleep(interval)
+
+    t = threading.Thread(target=loop, name="tag-index", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,89 @@
+import base64
+from skos_manager import get_skos_manager
+from utils import normalize_tag_key
+
+# 태그 검색 공용 로직 (app.py의 Flask 핸들러와 async_app.py가 같은 결과/JSON 형식을 내도록 공유)
+# - SKOS 확장, DB 검색 SQL, 키셋 커서, 응답 항목 형식, DB/Spotify 병합
+
+
+def db_track_item(tid, title, artist, image, preview):
+    return { "id": tid, "name": f"[추천] {title}", "artists": [{"name": artist}], "album": { "name": "Unknown", "images": [{"url": image or "img/playlist-placeholder.png"}] }, "preview_url": preview }
+
+
+def encode_cursor(after):
+    if not after: return None
+    return base64.urlsafe_b64encode(f"{after[0]}:{after[1]}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """'점수:곡ID' (base64) -> (점수, 곡ID), 형식 오류 시 ValueError"""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    score, tid = raw.split(':', 1)
+    return int(score), tid
+
+
+def expand_tags(tag_keyword):
+    """검색어 확장 (SKOS)"""
+    search_tags = [tag_keyword]
+    skos = get_skos_manager()
+    if skos:
+        # get_narrower_tags가 이제 ['JPop', 'J-Pop', 'Jpop', '제이팝'] 다 줍니다. (미리 계산된 확장 결과 조회)
+        expanded = skos.get_narrower_tags(tag_keyword)
+        if expanded: search_tags = expanded
+    
+    print(f"🔍 [Search] '{tag_keyword}' 확장 결과: {search_tags}") # 디버그 로그
+    return search_tags
+
+
+def index_page_items(page):
+    """tag_index.search_page 결과 -> 응답 항목"""
+    return [db_track_item(tid, *meta[:4]) for score, tid, meta in page]
+
+
+def search_sql(search_tags, tag_keyword, after, limit):
+    """역색인 적재 전 사용하는 DB 태그 검색 (점수 계산/정렬/키셋 페이지네이션을 SQL에서 처리) -> (sql, binds)
+    점수: 조회수 + (원래 태그와 정확히 일치 10000 / 확장 태그 일치 5000)"""
+    # 대소문자 무시 비교
+    # 정규화 키(tag: 접두어 + 소문자)로 TAGS 인덱스 조회 후 TRACK_TAGS(tag_num) 범위 스캔
+    tag_keys = sorted({normalize_tag_key(t) for t in search_tags})
+    bind_names = [f":t{i}" for i in range(len(tag_keys))]
+    bind_dict = {f"t{i}": k for i, k in enumerate(tag_keys)}
+    bind_dict.update({"exact": normalize_tag_key(tag_keyword), "c_score": after[0] if after else None,
+                      "c_tid": after[1] if after else None, "n": limit + 1})
+    
+    sql = f"""
+        SELECT track_id, track_title, artist_name, image_url, preview_url, score FROM (
+            SELECT t.track_id, t.track_title, t.artist_name, t.image_url, t.preview_url,
+                   NVL(t.views, 0) + MAX(CASE WHEN g.tag_key = :exact THEN 10000 ELSE 5000 END) AS score
+            FROM TAGS g
+            JOIN TRACK_TAGS tt ON tt.tag_num = g.tag_num
+            JOIN TRACKS t ON t.track_id = tt.track_id
+            WHERE g.tag_key IN ({','.join(bind_names)})
+            GROUP BY t.track_id, t.track_title, t.artist_name, t.image_url, t.preview_url, t.views
+        )
+        WHERE :c_score IS NULL OR score < :c_score OR (score = :c_score AND track_id > :c_tid)
+        ORDER BY score DESC, track_id
+        FETCH FIRST :n ROWS ONLY
+    """
+    return sql, bind_dict
+
+
+def sql_page_items(rows, limit):
+    """search_sql 결과 행 -> (응답 항목, 다음 커서)"""
+    page = rows[:limit]
+    next_after = (int(page[-1][5]), page[-1][0]) if len(rows) > limit else None
+    return [db_track_item(r[0], r[1], r[2], r[3], r[4]) for r in page], next_after
+
+
+def merge_results(db_items, spotify_items):
+    """병합 순서: DB 먼저, 그다음 Spotify (중복 제거)"""
+    seen_ids = set(); final_items = []
+    for item in db_items:
+        if item['id'] not in seen_ids: final_items.append(item); seen_ids.add(item['id'])
+    for item in spotify_items:
+        if item['id'] not in seen_ids: final_items.append(item); seen_ids.add(item['id'])
+    return final_items
+
+
+def search_response(final_items, offset, next_after, partial):
+    return { "tracks": { "items": final_items, "total": len(final_items), "offset": offset, "next_cursor": encode_cursor(next_after) }, "partial": partial }
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 저장소 루트의 모듈(search_cache, user_auth, app 등)을 import 할 수 있도록
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# app.py import 시 DB 풀/백그라운드 스레드를 만들지 않음 (gunicorn post_fork와 같은 방식)
+os.environ.setdefault("APP_DEFER_WORKER_INIT", "1")
@@ -0,0 +1,42 @@
+import services
+
+
+class FakeResponse:
+    def __init__(self, ids): self.status_code = 200; self._ids = ids
+    def json(self):
+        return {"tracks": [{"id": t, "name": f"T {t}", "artists": [{"name": "A"}], "album": {"id": "al", "images": []},
+                            "duration_ms": 1000} for t in self._ids],
+                "audio_features": [{"id": t, "tempo": 120, "key": 1} for t in self._ids]}
+
+
+class FakeCursor:
+    def __init__(self): self.rows = []
+    def execute(self, sql, binds): pass
+    def __iter__(self): return iter(())
+    def executemany(self, sql, rows, batcherrors=False): self.rows = rows
+    def getbatcherrors(self): return []
+
+
+class FakeConn:
+    def __init__(self): self.cur = FakeCursor()
+    def cursor(self): return self.cur
+    def commit(self): pass
+
+
+def test_failed_chunk_does_not_abort_bulk_import(monkeypatch):
+    ids = [f"t{i:03d}" for i in range(120)]  # /tracks 50개씩 -> 3묶음
+
+    def fake_get(url, params=None, **kwargs):
+        chunk = params["ids"].split(",")
+        if url.endswith("/tracks") and "t050" in chunk: raise ConnectionError("read timeout")
+        return FakeResponse(chunk)
+
+    monkeypatch.setattr(services.http_client, "get", fake_get)
+    conn = FakeConn()
+    results, _ = services.save_tracks_bulk(ids, conn, {})
+
+    failed = [t for t, r in results.items() if r["status"] == "error"]
+    assert failed == ids[50:100]
+    assert "read timeout" in results["t050"]["error"]
+    assert all(results[t]["status"] == "saved" for t in ids[:50] + ids[100:])
+    assert len(conn.cur.rows) == 70
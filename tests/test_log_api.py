@@ -0,0 +1,17 @@
+import pytest
+import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def no_db(): raise AssertionError("DB 커넥션을 잡으면 안 됨")
+    monkeypatch.setattr(app, "get_db_connection", no_db)
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("url", ["/api/admin/logs?limit=abc", "/api/admin/logs?cursor=%%%",
+                                 "/api/track/t1/logs?limit=1.5", "/api/track/t1/logs?cursor=bm90LWEtY3Vyc29y"])
+def test_bad_page_args_return_400_without_db(client, url):
+    res = client.get(url)
+    assert res.status_code == 400
+    assert "cursor/limit" in res.get_json()["error"]
@@ -0,0 +1,64 @@
+import pytest
+import recommend_pool
+
+
+def row(tid, views=0): return (tid, f"title-{tid}", "artist", None, None, views)
+
+
+class FakeCursor:
+    def __init__(self, rows, tracks): self.rows, self.tracks, self.pool_queries, self.result = rows, tracks, 0, None
+    def execute(self, sql, binds):
+        if "FROM TAGS g" in sql:
+            self.pool_queries += 1
+            keys = set(binds.values())
+            self.result = [r for r in self.rows if r[6] in keys]
+        elif sql.startswith("SELECT track_id, track_title"):
+            self.result = [self.tracks[binds[0]]]
+    def fetchall(self): return self.result
+    def fetchone(self): return self.result[0]
+
+
+class FakeConn:
+    def __init__(self, cur): self.cur = cur
+    def cursor(self): return self.cur
+
+
+@pytest.fixture
+def cur(monkeypatch):
+    tracks = {t: row(t) for t in ("a", "b", "c")}
+    rows = [tracks["a"] + ("tag:jpop",), tracks["b"] + ("tag:jpop",), tracks["b"] + ("tag:retro",)]
+    cur = FakeCursor(rows, tracks)
+    monkeypatch.setattr(recommend_pool, "get_db_connection", lambda: FakeConn(cur))
+    monkeypatch.setattr(recommend_pool, "get_skos_manager", lambda: None)
+    recommend_pool._pools.clear()
+    return cur
+
+
+def pool_ids(tags):
+    return sorted(r[0] for r in recommend_pool.sample_tracks(tags, 100))
+
+
+def test_tag_deltas_update_pool_without_reload(cur):
+    assert pool_ids(["jpop", "retro"]) == ["a", "b"]
+
+    recommend_pool.add_track_tags("c", ["tag:Retro"], cur)
+    assert pool_ids(["jpop", "retro"]) == ["a", "b", "c"]
+
+    # b는 retro 태그가 남아 있으므로 유지, a는 제거
+    recommend_pool.remove_track_tag("b", "tag:jpop")
+    recommend_pool.remove_track_tag("a", "tag:jpop")
+    assert pool_ids(["jpop", "retro"]) == ["b", "c"]
+    assert cur.pool_queries == 1
+
+
+def test_delta_during_build_marks_pool_stale(cur, monkeypatch):
+    load = recommend_pool._load_pool
+
+    def racing_load(conn, tag_keys):
+        pool = load(conn, tag_keys)
+        recommend_pool.add_track_tags("c", ["tag:jpop"], cur)  # 쿼리 후 저장 전에 들어온 변경
+        return pool
+    monkeypatch.setattr(recommend_pool, "_load_pool", racing_load)
+
+    recommend_pool.sample_tracks(["jpop"])
+    assert recommend_pool._pools[recommend_pool._pool_key(["jpop"])]["stale"]
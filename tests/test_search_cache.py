@@ -0,0 +1,91 @@
+import time
+import asyncio
+import threading
+import pytest
+import config
+import search_cache
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    search_cache.clear()
+    yield
+    search_cache.clear()
+
+
+def test_concurrent_failure_calls_loader_once():
+    calls = []
+    started = threading.Event()
+
+    def loader():
+        calls.append(1); started.set()
+        time.sleep(0.2)
+        raise ConnectionError("upstream 429")
+
+    results = []
+    def worker():
+        try: results.append(search_cache.get_or_fetch("k", loader, wait_timeout=2))
+        except ConnectionError: results.append("raised")
+
+    threads = [threading.Thread(target=worker)]
+    threads[0].start(); started.wait(1)
+    threads += [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads[1:]: t.start()
+    for t in threads: t.join()
+
+    assert len(calls) == 1
+    assert results.count("raised") == 1 and results.count(None) == 4
+
+
+def test_concurrent_none_result_calls_loader_once():
+    calls = []
+    def loader():
+        calls.append(1); time.sleep(0.2)
+        return None
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(search_cache.get_or_fetch("k", loader, wait_timeout=2))) for _ in range(5)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(calls) == 1 and results == [None] * 5
+
+
+def test_async_concurrent_failure_calls_loader_once():
+    calls = []
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        raise ConnectionError("upstream 5xx")
+
+    async def main():
+        return await asyncio.gather(*[search_cache.get_or_fetch_async("k", loader, wait_timeout=2) for _ in range(5)],
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert sum(isinstance(r, ConnectionError) for r in results) == 1 and results.count(None) == 4
+
+
+def test_coalescing_without_ttl_storage():
+    search_cache.configure(ttl=0)
+    try:
+        calls = []
+        def loader():
+            calls.append(1); time.sleep(0.2)
+            return ["v"], 1
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(search_cache.get_or_fetch("k", loader, wait_timeout=2))) for _ in range(5)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        assert len(calls) == 1 and results == [["v"]] * 5
+    finally:
+        search_cache.configure(ttl=config.SEARCH_CACHE_TTL)
+
+
+@pytest.mark.parametrize("body", [{"ttl": "abc"}, {"max_entries": -1}, {"max_bytes": 1.5}, {"ttl": True}])
+def test_admin_configure_rejects_bad_limits(body, monkeypatch):
+    import app
+    def no_db(): raise AssertionError("DB 커넥션을 잡으면 안 됨")
+    monkeypatch.setattr(app, "get_db_connection", no_db)
+    res = app.app.test_client().post("/api/admin/search-cache", json={"admin_id": "admin", **body})
+    assert res.status_code == 400
@@ -0,0 +1,23 @@
+import os
+import hashlib
+import skos_snapshot
+
+
+def test_touched_source_refreshes_header(tmp_path, monkeypatch):
+    ttl = tmp_path / "vocab.ttl"
+    ttl.write_bytes(b"@prefix skos: <http://www.w3.org/2004/02/skos/core#> .\n")
+    tables = skos_snapshot.SkosTables(hashlib.sha1(ttl.read_bytes()).hexdigest(), ["c:a"], [("c:a", "jpop", "ko")],
+                                      {}, {"c:a": ["c:b"]}, {})
+    skos_snapshot.write_snapshot(tables, str(ttl))
+
+    st = os.stat(ttl)
+    os.utime(ttl, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # 내용은 그대로, mtime만 변경
+
+    hashed = []
+    sha1 = skos_snapshot._file_sha1
+    monkeypatch.setattr(skos_snapshot, "_file_sha1", lambda p: hashed.append(p) or sha1(p))
+
+    assert skos_snapshot.load_snapshot(str(ttl)).broader == {"c:a": ["c:b"]}
+    assert len(hashed) == 1
+    assert skos_snapshot.load_snapshot(str(ttl)) is not None
+    assert len(hashed) == 1  # 헤더가 갱신되어 두 번째 로드는 해시 계산 생략
@@ -0,0 +1,52 @@
+import pytest
+import config
+import user_auth
+
+
+class FakeCursor:
+    def __init__(self, users): self.users, self.queries, self.row = users, 0, None
+    def execute(self, sql, binds):
+        if sql.startswith("SELECT is_banned, role FROM USERS"):
+            self.queries += 1
+            self.row = self.users.get(binds[0])
+        elif sql.startswith("INSERT INTO USERS"):
+            self.users[binds[0]] = (0, 'user')
+    def fetchone(self): return self.row
+
+
+class FakeConn:
+    def __init__(self, cur): self.cur = cur
+    def cursor(self): return self.cur
+    def commit(self): pass
+
+
+@pytest.fixture
+def users(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "AUTH_GENERATION_FILE", str(tmp_path / ".auth_generation"))
+    monkeypatch.setattr(config, "USER_AUTH_TTL", 60)
+    user_auth.invalidate()
+    return {}
+
+
+def test_signup_after_missing_lookup(users, monkeypatch):
+    import app
+    cur = FakeCursor(users)
+    monkeypatch.setattr(app, "get_db_connection", lambda: FakeConn(cur))
+
+    assert user_auth.get_user_auth(cur, "newbie") is None
+    assert user_auth.get_user_auth(cur, "newbie") is None  # 캐시된 '없는 유저'
+    assert cur.queries == 1
+
+    res = app.app.test_client().post("/api/auth/signup", json={"id": "newbie", "password": "pw", "nickname": "n"})
+    assert res.status_code == 200
+
+    assert user_auth.get_user_auth(cur, "newbie") == (0, 'user')
+    assert not user_auth.is_banned(cur, "newbie")
+
+
+def test_missing_user_uses_negative_ttl(users, monkeypatch):
+    monkeypatch.setattr(config, "USER_AUTH_NEGATIVE_TTL", 0)
+    cur = FakeCursor(users)
+    assert user_auth.get_user_auth(cur, "later") is None
+    users["later"] = (0, 'admin')  # 캐시 무효화 없이 DB에 직접 생성 (create_admin 등)
+    assert user_auth.is_admin(cur, "later")
@@ -0,0 +1,95 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+import config
+
+# 유저 권한 상태(is_banned, role) 캐시
+# - 태그 추가/삭제, 관리자 API마다 USERS를 조회하던 것을 TTL 캐시로 대체
+# - 밴/권한 변경 시 invalidate() -> 공유 세대 파일(AUTH_GENERATION_FILE)을 갱신
+#   다른 워커는 조회할 때 파일 mtime을 확인해 바뀌었으면 캐시 전체를 비움 (stat 1회, DB 왕복 없음)
+# - 파일 갱신이 실패해도 TTL(USER_AUTH_TTL)이 지나면 반영됨
+# - 키는 클라이언트가 보낸 user_id(없는 유저 포함)이므로 LRU로 USER_AUTH_MAX_ENTRIES개까지만 보관
+
+_cache = OrderedDict()  # user_id -> (만료 시각, (is_banned, role) 또는 None), 오래 안 쓴 순
+_lock = threading.Lock()
+_seen_generation = None
+_epoch = 0              # 무효화마다 증가 (DB 조회 도중 무효화된 결과는 저장하지 않음)
+_stats = {"hit": 0, "miss": 0, "evict": 0, "invalidate": 0, "generation_change": 0}
+
+
+def _file_generation():
+    try:
+        st = os.stat(config.AUTH_GENERATION_FILE)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        return None
+
+
+def _check_generation():
+    """다른 프로세스가 무효화했으면 캐시 비움"""
+    global _seen_generation, _epoch
+    generation = _file_generation()
+    if generation != _seen_generation:
+        with _lock:
+            if _seen_generation is not None or generation is not None: _stats["generation_change"] += 1
+            _cache.clear()
+            _seen_generation = generation
+            _epoch += 1
+
+
+def get_user_auth(cur, user_id):
+    """(is_banned, role) 또는 유저가 없으면 None"""
+    _check_generation()
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(user_id)
+        if entry and entry[0] > now:
+            _cache.move_to_end(user_id)
+            _stats["hit"] += 1
+            return entry[1]
+        if entry: del _cache[user_id]  # 만료
+        _stats["miss"] += 1
+        epoch = _epoch
+    cur.execute("SELECT is_banned, role FROM USERS WHERE user_id=:1", [user_id])
+    row = cur.fetchone()
+    value = (row[0], row[1]) if row else None
+    with _lock:
+        if epoch == _epoch:
+            # 없는 유저는 짧게만 (가입/DB 직접 생성 시 invalidate가 누락돼도 금방 반영)
+            _cache[user_id] = (now + (config.USER_AUTH_TTL if value else config.USER_AUTH_NEGATIVE_TTL), value)
+            _cache.move_to_end(user_id)
+            while len(_cache) > config.USER_AUTH_MAX_ENTRIES:
+                _cache.popitem(last=False)
+                _stats["evict"] += 1
+    return value
+
+
+def is_admin(cur, user_id):
+    auth = get_user_auth(cur, user_id)
+    return bool(auth) and auth[1] == 'admin'
+
+
+def is_banned(cur, user_id):
+    auth = get_user_auth(cur, user_id)
+    return bool(auth) and auth[0] == 1
+
+
+def invalidate(user_id=None):
+    """권한 변경 커밋 후 호출: 이 프로세스 캐시 삭제 + 세대 파일 갱신(다른 워커/프로세스에 전파)"""
+    global _epoch
+    with _lock:
+        if user_id is None: _cache.clear()
+        else: _cache.pop(user_id, None)
+        _epoch += 1
+    _stats["invalidate"] += 1
+    try:
+        tmp = f"{config.AUTH_GENERATION_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f: f.write(f"{time.time_ns()} {user_id or '*'}\n")
+        os.replace(tmp, config.AUTH_GENERATION_FILE)
+    except OSError as e:
+        print(f"⚠️ [UserAuth] 세대 파일 갱신 실패 (TTL 후 반영): {e}")
+
+
+def get_auth_stats():
+    return {**_stats, "entries": len(_cache)}
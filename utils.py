@@ -1,7 +1,9 @@
 import re
 import base64
-import requests
+import http_client
 import json
+import time
+import threading
 from datetime import datetime, timedelta
 from difflib import SequenceMatcher
 import config
@@ -16,6 +18,12 @@ def clean_text(text):
     text = re.sub(r'[^a-z0-9가-힣\s]', ' ', text)
     return ' '.join(text.split())
 
+def normalize_tag_key(tag):
+    """TAGS.tag_key 형식 ('tag:' 접두어 + 소문자) - 태그 조회는 항상 이 키로"""
+    tag = (tag or "").strip()
+    if not tag.startswith("tag:"): tag = f"tag:{tag}"
+    return tag.lower()
+
 def get_similarity(a, b):
     return SequenceMatcher(None, clean_text(a), clean_text(b)).ratio()
 
@@ -57,7 +65,7 @@ def extract_spotify_id(url):
 def verify_turnstile(token):
     if not token: return False, "캡차 토큰이 없습니다."
     try:
-        res = requests.post(
+        res = http_client.post(
             "https://challenges.cloudflare.com/turnstile/v0/siteverify",
             data={"secret": CLOUDFLARE_SECRET_KEY, "response": token}
         ).json()
@@ -65,27 +73,69 @@ def verify_turnstile(token):
     except: return False, "보안 검증 오류"
 
 # --- 3. 외부 API 연동 (Spotify) ---
-def get_spotify_headers():
-    if not config.SPOTIFY_CLIENT_ID or not config.SPOTIFY_CLIENT_SECRET:
-        return {}
+# Client Credentials 토큰은 expires_in 직전까지 재사용 (요청마다 토큰 발급 POST 방지)
+# 갱신은 락을 잡은 한 스레드만 수행하고, 나머지는 갱신된 토큰을 그대로 사용
+_spotify_token = {"value": None, "expires_at": 0.0}
+_spotify_token_lock = threading.Lock()
+_spotify_token_stats = {"hit": 0, "miss": 0, "refresh": 0, "error": 0}
+
+def _request_spotify_token():
+    """토큰 발급 요청 -> (access_token, expires_in) 또는 None"""
     try:
         auth = base64.b64encode(f"{config.SPOTIFY_CLIENT_ID}:{config.SPOTIFY_CLIENT_SECRET}".encode()).decode()
-        res = requests.post(config.SPOTIFY_AUTH_URL, headers={
+        res = http_client.post(config.SPOTIFY_AUTH_URL, retries=1, headers={
             'Authorization': f'Basic {auth}',
             'Content-Type': 'application/x-www-form-urlencoded'
         }, data={'grant_type': 'client_credentials'}, timeout=5)
         if res.status_code == 200:
-            return {'Authorization': f'Bearer {res.json().get("access_token")}'}
-    except: pass
-    return {}
+            body = res.json()
+            return body.get("access_token"), int(body.get("expires_in", 3600))
+        print(f"⚠️ [Spotify] 토큰 발급 실패: {res.status_code}")
+    except Exception as e:
+        print(f"⚠️ [Spotify] 토큰 발급 에러: {e}")
+    return None
+
+def get_spotify_token():
+    now = time.monotonic()
+    if _spotify_token["value"] and now < _spotify_token["expires_at"]:
+        _spotify_token_stats["hit"] += 1
+        return _spotify_token["value"]
+
+    with _spotify_token_lock:
+        # 락 대기 중 다른 스레드가 이미 갱신했으면 그대로 사용
+        if _spotify_token["value"] and time.monotonic() < _spotify_token["expires_at"]:
+            _spotify_token_stats["hit"] += 1
+            return _spotify_token["value"]
+
+        _spotify_token_stats["miss"] += 1
+        issued = _request_spotify_token()
+        if not issued or not issued[0]:
+            _spotify_token_stats["error"] += 1
+            return None
+        token, expires_in = issued
+        _spotify_token["value"] = token
+        _spotify_token["expires_at"] = time.monotonic() + max(expires_in - config.SPOTIFY_TOKEN_REFRESH_MARGIN, 0)
+        _spotify_token_stats["refresh"] += 1
+        return token
+
+def get_spotify_token_stats():
+    remaining = _spotify_token["expires_at"] - time.monotonic() if _spotify_token["value"] else 0
+    return {**_spotify_token_stats, "refresh_in": max(int(remaining), 0)}
+
+def get_spotify_headers():
+    if not config.SPOTIFY_CLIENT_ID or not config.SPOTIFY_CLIENT_SECRET:
+        return {}
+    token = get_spotify_token()
+    return {'Authorization': f'Bearer {token}'} if token else {}
 
 # --- 4. 공공데이터 API 연동 ---
-def get_current_weather():
+# fetch_* 함수는 실패 시 None 을 반환 (캐시가 기존 값을 유지할 수 있도록)
+def fetch_current_weather():
     if not config.DATA_GO_KR_API_KEY: return "Clear"
     try:
         now = datetime.now()
-        base_date = now.strftime("%Y%m%d")
         if now.minute < 45: now -= timedelta(hours=1)
+        base_date = now.strftime("%Y%m%d")
         base_time = now.strftime("%H00")
 
         params = {
@@ -94,8 +144,8 @@ def get_current_weather():
             'base_date': base_date, 'base_time': base_time,
             'nx': '60', 'ny': '127'
         }
-        res = requests.get(config.WEATHER_API_URL, params=params, timeout=3)
-        if res.status_code != 200: return "Clear"
+        res = http_client.get(config.WEATHER_API_URL, params=params, timeout=3)
+        if res.status_code != 200: return None
 
         items = res.json().get('response', {}).get('body', {}).get('items', {}).get('item', [])
         pty = next((item['obsrValue'] for item in items if item['category'] == 'PTY'), "0")
@@ -103,25 +153,28 @@ def get_current_weather():
         if pty in ["1", "5", "2", "6"]: return "Rain"
         if pty in ["3", "7"]: return "Snow"
         return "Clear"
-    except: return "Clear"
+    except: return None
 
-def get_today_holiday():
-    if not config.DATA_GO_KR_API_KEY: return None
+def get_current_weather():
+    return fetch_current_weather() or "Clear"
+
+def fetch_month_holidays(year, month):
+    """해당 월의 공휴일 {YYYYMMDD: 이름}"""
+    if not config.DATA_GO_KR_API_KEY: return {}
     try:
-        now = datetime.now()
         params = {
             'serviceKey': config.DATA_GO_KR_API_KEY,
-            'solYear': now.year, 
-            'solMonth': f"{now.month:02d}",
+            'solYear': year, 
+            'solMonth': f"{month:02d}",
             '_type': 'json'
         }
-        res = requests.get(config.HOLIDAY_API_URL, params=params, timeout=3)
+        res = http_client.get(config.HOLIDAY_API_URL, params=params, timeout=3)
+        if res.status_code != 200: return None
         items = res.json().get('response', {}).get('body', {}).get('items', {}).get('item', [])
         if isinstance(items, dict): items = [items]
-        
-        today_str = now.strftime("%Y%m%d")
-        for item in items:
-            if str(item.get('locdate')) == today_str and item.get('isHoliday') == 'Y':
-                return item.get('dateName')
-        return None
-    except: return None
\ No newline at end of file
+        return {str(item.get('locdate')): item.get('dateName') for item in items if item.get('isHoliday') == 'Y'}
+    except: return None
+
+def get_today_holiday():
+    now = datetime.now()
+    return (fetch_month_holidays(now.year, now.month) or {}).get(now.strftime("%Y%m%d"))